@@ -0,0 +1,404 @@
+# bench/checks.py
+"""
+Behaviour checks for the components the benchmark relies on, so a
+speed-up that changes results fails here rather than going unnoticed.
+
+    python -m bench.checks
+
+- embedding_cache : round trip, one writer per directory (other instances
+                    read-only), a reused row is a miss rather than another
+                    text's vector, and rows survive a reopen
+- dedupe_warmup   : Deduper warms its embedding index and SimHash
+                    fingerprints from the newest DEDUP_INDEX_SIZE rows
+- rrf             : reciprocal_rank_fusion ordering and tie-breaking
+- query_cache     : a search whose LLM call failed is not cached, so the
+                    next identical query gets a real answer
+- query_stream    : GET /query/stream against the stub Ollama server sends
+                    entities -> results -> token/answer per field -> done,
+                    and a slow LLM gets timeout placeholders within
+                    LLM_QUERY_BUDGET
+- ingest_retry    : when an ingest batch fails after dedupe, the per-article
+                    retry stores every article as itself, not as a
+                    duplicate of its own half-ingested copy
+
+Nothing outside a temp dir is touched and no model, Chroma or Ollama is
+needed (LLM calls go to src.llm.stub_ollama; retrieval is replaced by a
+fixed ranking where only the LLM, cache and API layers are under test). Exits 1 when any check fails.
+"""
+
+import argparse
+import copy
+import json
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+
+def _vec(value: float, dim: int = 8) -> np.ndarray:
+    return np.full((1, dim), value, dtype=np.float32)
+
+
+@contextmanager
+def _config(**values):
+    """Temporarily override Config attributes."""
+    from src.config.config import Config
+
+    saved = {name: getattr(Config, name) for name in values}
+    for name, value in values.items():
+        setattr(Config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(Config, name, value)
+
+
+@contextmanager
+def _ollama_at(url: str):
+    """Point src.llm.service at another /api/generate URL."""
+    from src.llm import service
+
+    saved = service.OLLAMA_URL
+    service.OLLAMA_URL = url
+    try:
+        yield
+    finally:
+        service.OLLAMA_URL = saved
+
+
+def _ranked_engine(ranked: dict):
+    """QueryEngine whose rank() returns `ranked`: the LLM / cache steps run for real, retrieval does not."""
+    from src.query.query_cache import QueryCache
+    from src.query.query_engine import QueryEngine
+
+    engine = QueryEngine.__new__(QueryEngine)
+    engine.cache = QueryCache(ttl=60)
+    engine._llm_store, engine._llm_store_failed = None, False
+    engine.rank = lambda query, top_k=10, since=None, until=None: copy.deepcopy(ranked)
+    return engine
+
+
+RANKED = {
+    "query_entities": [{"text": "HDFC Bank", "label": "ORG"}],
+    "expanded": {"companies": ["HDFC Bank"], "tickers": ["HDFCBANK"], "sectors": ["BANKING"]},
+    "results": [
+        {"id": "1", "title": "HDFC Bank raises rates", "doc_text": "HDFC Bank raised lending rates."},
+        {"id": "2", "title": "HDFC Bank results", "doc_text": "HDFC Bank reported higher profit."},
+    ],
+}
+
+
+# -----------------------------------
+# Embedding cache
+# -----------------------------------
+def check_embedding_cache():
+    from src.vector.embedding_cache import EmbeddingCache
+
+    workdir = Path(tempfile.mkdtemp(prefix="check-cache-"))
+    try:
+        writer = EmbeddingCache("check-model", cache_dir=str(workdir), max_entries=4, flush_every=1)
+        reader = EmbeddingCache("check-model", cache_dir=str(workdir), max_entries=4, reload_interval=0)
+        assert writer.stats()["mode"] == "writer", writer.stats()
+        assert reader.stats()["mode"] == "read-only", reader.stats()
+
+        alpha, beta = writer.key("alpha"), writer.key("beta")
+        writer.put_many([alpha], _vec(1.0))
+        got = writer.get_many([alpha, beta])
+        assert np.array_equal(got[0], _vec(1.0)[0]) and got[1] is None, "writer round trip"
+
+        reader.put_many([beta], _vec(2.0))  # read-only: ignored
+        got = reader.get_many([alpha, beta])
+        assert np.array_equal(got[0], _vec(1.0)[0]), "reader sees the writer's rows"
+        assert got[1] is None, "reader put_many must not write"
+
+        # freeze the reader's index, then make the writer evict alpha and reuse its row
+        reader.reload_interval = float("inf")
+        for i in range(6):
+            writer.put_many([writer.key(f"filler-{i}")], _vec(10.0 + i))
+        assert writer.get_many([alpha])[0] is None, "alpha evicted"
+        assert reader.get_many([alpha])[0] is None, "stale slot must miss, not return another vector"
+
+        writer.flush()
+        reopened = EmbeddingCache("check-model", cache_dir=str(workdir), max_entries=4)
+        assert reopened.read_only, "writer lock is still held"
+        assert np.array_equal(reopened.get_many([writer.key("filler-5")])[0], _vec(15.0)[0]), "reopen"
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# -----------------------------------
+# Dedupe warm-up
+# -----------------------------------
+class ListCollection:
+    """In-memory collection with Chroma's count() / get(limit, offset) paging (insertion order)."""
+
+    def __init__(self, ids, embeddings, documents):
+        self.ids = list(ids)
+        self.embeddings = np.asarray(embeddings, dtype=np.float32)
+        self.documents = list(documents)
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def get(self, include=None, limit=None, offset=0, **_):
+        end = len(self.ids) if limit is None else offset + limit
+        resp = {"ids": self.ids[offset:end]}
+        if "embeddings" in (include or []):
+            resp["embeddings"] = self.embeddings[offset:end]
+        if "documents" in (include or []):
+            resp["documents"] = self.documents[offset:end]
+        return resp
+
+
+def check_dedupe_warmup(n_docs: int = 100, window: int = 20):
+    from src.config.config import Config
+    from src.dedupe.deduper import Deduper
+    from src.dedupe.fingerprint import SimHashIndex, simhash
+    from src.dedupe.recent_index import RecentEmbeddingIndex
+
+    rng = np.random.default_rng(0)
+    vocab = [f"w{i}" for i in range(500)]
+    ids = [str(i) for i in range(1, n_docs + 1)]
+    documents = [" ".join(rng.choice(vocab, size=40)) for _ in ids]
+    collection = ListCollection(ids, rng.standard_normal((n_docs, 8)), documents)
+
+    with _config(DEDUP_INDEX_SIZE=window):
+        # the warm-up only needs the collection and the two indexes
+        deduper = Deduper.__new__(Deduper)
+        deduper.collection = collection
+        deduper.index = RecentEmbeddingIndex(window)
+        deduper.fingerprints = SimHashIndex(Config.DEDUP_SIMHASH_MAX_DISTANCE, window)
+        deduper._warm_from_collection(page_size=7)
+
+    newest, oldest = ids[-window:], ids[:-window]
+    assert len(deduper.index) == window and len(deduper.fingerprints) == window
+    assert all(deduper.index.get(i) is not None for i in newest), "index holds the newest rows"
+    assert all(deduper.index.get(i) is None for i in oldest), "index skips older rows"
+    shingle = Config.DEDUP_SIMHASH_SHINGLE
+    for doc_id in (newest[0], newest[-1]):
+        found, _ = deduper.fingerprints.find(simhash(documents[int(doc_id) - 1], shingle))
+        assert found == doc_id, f"fingerprint for {doc_id} -> {found}"
+    found, _ = deduper.fingerprints.find(simhash(documents[0], shingle))
+    assert found is None, f"oldest row should be outside the window, matched {found}"
+
+
+# -----------------------------------
+# Streaming endpoint (SSE) against the stub LLM
+# -----------------------------------
+def _sse_events(client, query: str) -> list:
+    """(event, data) pairs of one GET /query/stream, in arrival order."""
+    events, event = [], None
+    with client.stream("GET", "/query/stream", params={"query": query, "top_k": 2}) as resp:
+        assert resp.status_code == 200, resp.status_code
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        for line in resp.iter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                events.append((event, json.loads(line[len("data: "):])))
+    return events
+
+
+def _event_order(events) -> list:
+    """Event names with consecutive repeats collapsed (token, token, answer -> token, answer)."""
+    order = []
+    for event, _ in events:
+        if not order or order[-1] != event:
+            order.append(event)
+    return order
+
+
+def check_query_stream():
+    from fastapi.testclient import TestClient
+
+    from src.api import routes
+    from src.api.main import app
+    from src.llm.service import LLM_TIMEOUT_PLACEHOLDER
+    from src.llm.stub_ollama import STUB_REPLY, start_stub_server
+
+    fields = 2 * len(RANKED["results"])  # summary + impact_explain per result
+    saved_engine = routes.query_agent._engine
+    routes.query_agent._engine = _ranked_engine(RANKED)
+    fast, fast_url = start_stub_server()
+    slow, slow_url = start_stub_server(delay=0.1)  # ~1.2s per answer
+    try:
+        with TestClient(app) as client, _config(LLM_STORE_ENABLED=False, LLM_TOP_N=2):
+            with _config(LLM_QUERY_BUDGET=10.0), _ollama_at(fast_url):
+                events = _sse_events(client, "HDFC Bank news")
+            order = _event_order(events)
+            assert order == ["entities", "results"] + ["token", "answer"] * fields + ["done"], order
+            answers = [data for event, data in events if event == "answer"]
+            assert [a["field"] for a in answers] == ["summary", "impact_explain"] * 2, answers
+            assert all(a["text"] == STUB_REPLY for a in answers), answers
+
+            with _config(LLM_QUERY_BUDGET=0.5), _ollama_at(slow_url):
+                start = time.monotonic()
+                events = _sse_events(client, "HDFC Bank news")
+                seconds = time.monotonic() - start
+            order = _event_order(events)
+            assert order[:2] == ["entities", "results"] and order[-1] == "done", order
+            answers = [data for event, data in events if event == "answer"]
+            assert len(answers) == fields, answers
+            assert all(a["text"] == LLM_TIMEOUT_PLACEHOLDER for a in answers), answers
+            assert seconds < 1.5, f"stream took {seconds:.2f}s with a 0.5s budget"
+    finally:
+        routes.query_agent._engine = saved_engine
+        fast.shutdown()
+        slow.shutdown()
+
+
+# -----------------------------------
+# Ingest retry after a failed batch
+# -----------------------------------
+class WordHashEmbedder:
+    """Deterministic bag-of-words vectors (no model)."""
+
+    dim = 64
+
+    def embed_batch(self, texts):
+        m = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.split():
+                m[i, zlib.crc32(word.encode("utf-8")) % self.dim] += 1.0
+        return m
+
+    def embed_text(self, text):
+        return self.embed_batch([text])[0]
+
+
+class FlakyStorePipeline:
+    """
+    Pipeline stand-in: the real batch dedupe step, then a store step that
+    fails for any batch of more than one article (as a bad article would).
+    """
+
+    def __init__(self, deduper):
+        self.deduper = deduper
+        self.stored = {}
+        self.failed_batches = 0
+
+    def invoke(self, state):
+        articles = self.deduper.assign_story_ids_batch(state["articles"], upsert=False)
+        if len(articles) > 1:
+            self.failed_batches += 1
+            raise RuntimeError("store failed")
+        for a in articles:
+            self.stored[a["id"]] = a
+        return {"articles": articles}
+
+
+def check_ingest_retry(n_docs: int = 6):
+    from src.config.config import Config
+    from src.dedupe.deduper import Deduper
+    from src.dedupe.fingerprint import SimHashIndex
+    from src.dedupe.recent_index import RecentEmbeddingIndex
+    from src.pipeline.ingest_queue import IngestQueue
+
+    deduper = Deduper.__new__(Deduper)
+    deduper.threshold = 0.9
+    deduper.embedder = WordHashEmbedder()
+    deduper.index = RecentEmbeddingIndex(100)
+    deduper.fingerprints = SimHashIndex(Config.DEDUP_SIMHASH_MAX_DISTANCE, 100)
+
+    rng = np.random.default_rng(1)
+    vocab = [f"w{i}" for i in range(500)]
+    articles = [
+        {"id": str(i), "title": f"title {i}", "description": " ".join(rng.choice(vocab, size=40))}
+        for i in range(1, n_docs + 1)
+    ]
+    pipeline = FlakyStorePipeline(deduper)
+    ingest = IngestQueue(pipeline, maxsize=100, num_workers=1, batch_size=n_docs, batch_wait=1.0)
+    job_id = ingest.submit(articles)
+    ingest._queue.join()
+
+    job = ingest.get_job(job_id)
+    assert pipeline.failed_batches, "the batch should have failed and been retried per article"
+    assert job["processed"] == n_docs and job["failed"] == 0, job
+    assert sorted(pipeline.stored) == sorted(a["id"] for a in articles), sorted(pipeline.stored)
+    for doc_id, a in pipeline.stored.items():
+        assert not a["_dedupe_info"]["duplicate"], f"{doc_id} marked duplicate: {a['_dedupe_info']}"
+        assert a["story_id"] == doc_id
+
+
+# -----------------------------------
+# Reciprocal rank fusion
+# -----------------------------------
+def check_rrf():
+    from src.query.query_engine import reciprocal_rank_fusion
+
+    # in both lists beats one list; among those, better combined rank first
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a", "d"]], k=60)
+    assert fused == ["a", "c", "b", "d"], fused
+    # equal scores keep first appearance
+    assert reciprocal_rank_fusion([["x", "y"], ["y", "x"]]) == ["x", "y"]
+    assert reciprocal_rank_fusion([["x"], ["y"]]) == ["x", "y"]
+    # a single list comes back unchanged
+    assert reciprocal_rank_fusion([["p", "q", "r"]]) == ["p", "q", "r"]
+    assert reciprocal_rank_fusion([]) == []
+
+
+# -----------------------------------
+# Query cache vs LLM failures
+# -----------------------------------
+def check_query_cache():
+    from src.llm.service import LLM_ERROR_PREFIX
+    from src.llm.stub_ollama import STUB_REPLY, start_stub_server
+
+    engine = _ranked_engine(RANKED)
+    server, url = start_stub_server()
+    try:
+        with _config(LLM_STORE_ENABLED=False, LLM_QUERY_BUDGET=10.0):
+            # nothing listens on the discard port: every call errors
+            with _ollama_at("http://127.0.0.1:9/api/generate"):
+                first = engine.search("HDFC Bank news", top_k=2)
+            assert first["results"][0]["summary"].startswith(LLM_ERROR_PREFIX), first["results"][0]
+            assert engine.cache.stats()["entries"] == 0, "LLM errors must not be cached"
+
+            with _ollama_at(url):
+                second = engine.search("HDFC Bank news", top_k=2)
+                third = engine.search("HDFC Bank news", top_k=2)
+            assert second["results"][0]["summary"] == STUB_REPLY, second["results"][0]
+            assert third == second and engine.cache.hits == 1, "a good answer is cached"
+    finally:
+        server.shutdown()
+
+
+CHECKS = {
+    "embedding_cache": check_embedding_cache,
+    "dedupe_warmup": check_dedupe_warmup,
+    "rrf": check_rrf,
+    "query_cache": check_query_cache,
+    "query_stream": check_query_stream,
+    "ingest_retry": check_ingest_retry,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Behaviour checks for benchmarked components")
+    parser.add_argument("checks", nargs="*", metavar="CHECK", help=f"any of {', '.join(CHECKS)} (default: all)")
+    args = parser.parse_args()
+    unknown = [name for name in args.checks if name not in CHECKS]
+    if unknown:
+        parser.error(f"unknown check(s): {', '.join(unknown)}")
+
+    failed = 0
+    for name in args.checks or CHECKS:
+        try:
+            CHECKS[name]()
+            print(f"ok    {name}")
+        except Exception:
+            failed += 1
+            print(f"FAIL  {name}")
+            traceback.print_exc()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
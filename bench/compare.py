@@ -0,0 +1,120 @@
+# bench/compare.py
+"""
+Compare a benchmark result against a saved baseline and flag regressions.
+
+    python -m bench.compare bench/baseline.json bench/results/latest.json --threshold 0.10
+
+Works on any JSON written by the bench scripts: metrics are matched by
+their path (e.g. 1000.query.search.p95_ms). Direction comes from the
+name: *_ms is lower-is-better, docs_per_sec is higher-is-better; other
+fields are context and are not compared. Exits 1 when any metric got worse
+by more than --threshold (relative) and --min-ms (absolute, for timings).
+"""
+
+import argparse
+import json
+import sys
+
+HIGHER_IS_BETTER = ("docs_per_sec",)
+LOWER_IS_BETTER = ("_ms",)
+
+
+def flatten(obj, prefix: str = "") -> dict:
+    out = {}
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            out.update(flatten(value, f"{prefix}{key}."))
+    elif isinstance(obj, (int, float)) and not isinstance(obj, bool):
+        out[prefix[:-1]] = float(obj)
+    return out
+
+
+def direction(metric: str):
+    """+1 higher is better, -1 lower is better, None not compared."""
+    name = metric.rsplit(".", 1)[-1]
+    if name.endswith(HIGHER_IS_BETTER):
+        return 1
+    if name.endswith(LOWER_IS_BETTER):
+        return -1
+    return None
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10, min_ms: float = 1.0) -> list[dict]:
+    base = flatten(baseline.get("runs", baseline))
+    cur = flatten(current.get("runs", current))
+    rows = []
+    for metric in sorted(set(base) | set(cur)):
+        sign = direction(metric)
+        if sign is None:
+            continue
+        b, c = base.get(metric), cur.get(metric)
+        if b is None or c is None:
+            rows.append({"metric": metric, "baseline": b, "current": c, "change": None,
+                         "status": "new" if b is None else "missing"})
+            continue
+        change = (c - b) / b if b else 0.0
+        worse = -sign * change  # > 0 means worse
+        small = sign < 0 and abs(c - b) < min_ms
+        if worse > threshold and not small:
+            status = "REGRESSION"
+        elif worse < -threshold and not small:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"metric": metric, "baseline": b, "current": c, "change": round(change, 4), "status": status})
+    return rows
+
+
+def config_changes(baseline: dict, current: dict) -> list[str]:
+    """Settings that differ between the two runs (numbers may not be comparable)."""
+    changes = []
+    for size, run in current.get("runs", {}).items():
+        before = baseline.get("runs", {}).get(size, {}).get("config", {})
+        for key, value in run.get("config", {}).items():
+            if key in before and before[key] != value:
+                changes.append(f"runs.{size}.config.{key}: {before[key]} -> {value}")
+    return changes
+
+
+def _print(rows: list[dict], show_all: bool):
+    width = max((len(r["metric"]) for r in rows), default=10)
+    for r in rows:
+        if not show_all and r["status"] == "ok":
+            continue
+        change = f"{r['change'] * 100:+7.1f}%" if r["change"] is not None else "      -"
+        b = f"{r['baseline']:.2f}" if r["baseline"] is not None else "-"
+        c = f"{r['current']:.2f}" if r["current"] is not None else "-"
+        print(f"{r['metric']:<{width}}  {b:>12}  {c:>12}  {change}  {r['status']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag benchmark regressions against a baseline")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="ignore timing changes smaller than this")
+    parser.add_argument("--all", action="store_true", help="print unchanged metrics too")
+    parser.add_argument("--json", action="store_true", help="print the comparison as JSON")
+    args = parser.parse_args()
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+
+    rows = compare(baseline, current, args.threshold, args.min_ms)
+    regressions = [r for r in rows if r["status"] == "REGRESSION"]
+    if args.json:
+        print(json.dumps({"regressions": len(regressions), "metrics": rows}, indent=2))
+    else:
+        for key in ("git_commit", "timestamp"):
+            print(f"{key}: {baseline.get('meta', {}).get(key)} -> {current.get('meta', {}).get(key)}")
+        for change in config_changes(baseline, current):
+            print(f"note: {change}")
+        _print(rows, args.all)
+        print(f"{len(regressions)} regression(s), threshold {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
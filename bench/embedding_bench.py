@@ -0,0 +1,137 @@
+# bench/embedding_bench.py
+"""
+Embedding backend benchmark: throughput and agreement with the reference.
+
+    python -m bench.embedding_bench --backends torch onnx onnx-int8 --docs 2000
+
+Every backend embeds the same corpus (article title + description from
+data/news_final.json, repeated up to --docs). Reported per backend:
+- docs_per_sec : steady-state throughput (after one warm-up batch)
+- cosine vs the reference backend (torch, fp32): mean / min / p5
+- top1_agreement : share of docs whose nearest neighbour in the corpus
+  is the same under both backends
+
+Results are printed and, with --out, written as JSON.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from src.config.config import Config
+from src.utils import canonical_text
+from src.vector.embedding_service import BACKENDS, EmbeddingService
+
+CORPUS_JSON = "data/news_final.json"
+REFERENCE_BACKEND = "torch"
+
+
+def load_corpus(n_docs: int, path: str = CORPUS_JSON) -> list[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        texts = [t for t in (canonical_text(d) for d in json.load(f)) if t]
+    if not texts:
+        raise ValueError(f"No article text in {path}")
+    # repeat the sample (with a copy marker, so no two texts are identical)
+    return [
+        texts[i % len(texts)] + ("" if i < len(texts) else f" ({i // len(texts)})")
+        for i in range(n_docs)
+    ]
+
+
+def _unit(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return m / norms
+
+
+def run_backend(service: EmbeddingService, texts: list[str]):
+    service.encode(texts[: service.batch_size])  # warm-up (graph init, allocations)
+    start = time.perf_counter()
+    vectors = service.encode(texts)
+    seconds = time.perf_counter() - start
+    return vectors, seconds
+
+
+def agreement(reference: np.ndarray, candidate: np.ndarray) -> dict:
+    ref, cand = _unit(reference), _unit(candidate)
+    cos = np.einsum("ij,ij->i", ref, cand)
+
+    # nearest neighbour (excluding self) under each backend
+    def nearest(m):
+        sims = m @ m.T
+        np.fill_diagonal(sims, -np.inf)
+        return sims.argmax(axis=1)
+
+    return {
+        "cosine_mean": round(float(cos.mean()), 5),
+        "cosine_min": round(float(cos.min()), 5),
+        "cosine_p5": round(float(np.percentile(cos, 5)), 5),
+        "top1_agreement": round(float((nearest(ref) == nearest(cand)).mean()), 4),
+    }
+
+
+def run(backends, n_docs: int, batch_size: int = None, max_seq_length: int = None, model_name: str = None) -> dict:
+    texts = load_corpus(n_docs)
+    # the agreement check is O(n^2); cap the neighbour sample
+    sample = min(len(texts), 2000)
+
+    results = {
+        "model": model_name or Config.EMBEDDING_MODEL,
+        "docs": len(texts),
+        "reference": REFERENCE_BACKEND,
+        "backends": {},
+    }
+    order = [REFERENCE_BACKEND] + [b for b in backends if b != REFERENCE_BACKEND]
+    reference = None
+    for backend in order:
+        service = EmbeddingService(
+            model_name=model_name,
+            backend=backend,
+            batch_size=batch_size,
+            max_seq_length=max_seq_length
+        )
+        vectors, seconds = run_backend(service, texts)
+        entry = {
+            **service.info(),
+            "dim": int(vectors.shape[1]),
+            "seconds": round(seconds, 3),
+            "docs_per_sec": round(len(texts) / seconds, 1) if seconds else None,
+        }
+        if reference is None:
+            reference = vectors
+        else:
+            entry.update(agreement(reference[:sample], vectors[:sample]))
+            entry["speedup"] = round(
+                entry["docs_per_sec"] / results["backends"][REFERENCE_BACKEND]["docs_per_sec"], 2
+            )
+        results["backends"][backend] = entry
+        print(
+            f"{backend:<10} {entry['docs_per_sec']:>9} docs/s"
+            + (f"  cos mean {entry['cosine_mean']:.4f} min {entry['cosine_min']:.4f}"
+               f"  top1 {entry['top1_agreement']:.3f}  x{entry['speedup']}"
+               if "cosine_mean" in entry else "  (reference)")
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--model", default=None, help="defaults to EMBEDDING_MODEL")
+    parser.add_argument("--batch-size", type=int, default=None, help="defaults to EMBEDDING_BATCH_SIZE")
+    parser.add_argument("--max-seq-length", type=int, default=None, help="defaults to EMBEDDING_MAX_SEQ_LENGTH")
+    parser.add_argument("--out", default=None, help="write results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.backends, args.docs, args.batch_size, args.max_seq_length, args.model)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+# bench/perf_bench.py
+"""
+Performance benchmark for the ingest pipeline and the query path.
+
+    python -m bench.perf_bench --sizes 100 500 1000 --out bench/results/latest.json
+    python -m bench.compare bench/baseline.json bench/results/latest.json
+
+Each corpus size runs in a fresh subprocess against a throwaway Chroma
+directory, SQLite file and embedding cache (nothing outside the temp dir
+is touched), with Ollama replaced by src.llm.stub_ollama. Per size:
+- startup      : import / init / total load time of every heavy component
+                 (src.api.warmup)
+- ingest       : end-to-end docs/sec through the batch graph
+- nodes        : time spent in each graph node (dedup, ner, impact, store,
+                 index, ...) in total and per doc
+- query.search : QueryEngine.search latency p50/p95/p99 (LLM answers
+                 from the stub); query.rank: the same without LLM calls
+
+The corpus is data/news_final.json, extended to the requested size with
+distinct title/description recombinations.
+"""
+
+import argparse
+import functools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+CORPUS_JSON = ROOT / "data" / "news_final.json"
+COMPANY_CSV = ROOT / "data" / "company_to_ticker.csv"
+
+QUERIES = [
+    "Show me news affecting HDFC Bank",
+    "What RBI policies impact the banking sector?",
+    "Latest news impacting Infosys",
+    "Which companies are affected by the Fed rate cut?",
+    "bank earnings and interest rates",
+    "IT services outlook",
+]
+
+
+# -----------------------------------
+# Corpus / queries
+# -----------------------------------
+def synthetic_corpus(n_docs: int) -> list[dict]:
+    """
+    The sample articles, then title/description recombinations of them
+    (distinct texts, so dedupe and NER do real work) up to n_docs.
+    """
+    with open(CORPUS_JSON, "r", encoding="utf-8") as f:
+        base = [{k: v for k, v in d.items() if k != "entities"} for d in json.load(f)]
+    n = len(base)
+    docs = []
+    for k in range(n_docs):
+        i = k % n
+        doc = dict(base[i])
+        if k >= n:
+            j = (i + k // n) % n
+            doc["description"] = base[j]["description"]
+            doc["url"] = f"{doc.get('url')}#bench-{k}"
+        doc["id"] = k + 1
+        docs.append(doc)
+    return docs
+
+
+def query_set() -> list[str]:
+    queries = list(QUERIES)
+    with open(COMPANY_CSV, "r", encoding="utf-8") as f:
+        next(f)
+        for line in f:
+            name = line.split(",", 1)[0].strip()
+            if name:
+                queries.append(f"Latest news on {name}")
+    return queries
+
+
+# -----------------------------------
+# Measurement helpers
+# -----------------------------------
+class NodeTimer:
+    """build_pipeline(node_wrapper=...) hook: wall time per graph node."""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.agents = {}
+
+    def wrap(self, name, fn):
+        self.agents[name] = fn.__name__
+
+        @functools.wraps(fn)
+        def timed(state):
+            start = time.perf_counter()
+            try:
+                return fn(state)
+            finally:
+                self.seconds[name] += time.perf_counter() - start
+                self.calls[name] += 1
+
+        return timed
+
+    def report(self, n_docs: int, total_seconds: float) -> dict:
+        return {
+            name: {
+                "agent": self.agents[name],
+                "calls": self.calls[name],
+                "total_ms": round(self.seconds[name] * 1000, 2),
+                "per_doc_ms": round(self.seconds[name] * 1000 / n_docs, 3),
+                "share": round(self.seconds[name] / total_seconds, 4) if total_seconds else None,
+            }
+            for name in self.agents
+        }
+
+
+def latency_summary(samples: list[float]) -> dict:
+    ms = np.asarray(samples, dtype=np.float64) * 1000
+    if not len(ms):
+        return {"count": 0}
+    return {
+        "count": int(len(ms)),
+        "mean_ms": round(float(ms.mean()), 2),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return None
+
+
+# -----------------------------------
+# Worker: one corpus size in a fresh process
+# -----------------------------------
+def run_worker(n_docs: int, batch_size: int, query_rounds: int, top_k: int) -> dict:
+    # src is imported here, after the parent pointed Config at the temp dir
+    from src.api.warmup import warmup
+    from src.config.config import Config
+    from src.db.init_db import init_db
+    from src.pipeline.graph import build_pipeline
+    from src.query.query_engine import get_query_engine
+    from src.utils import chunked
+
+    init_db()
+    startup = {
+        name: {
+            "status": entry["status"],
+            "import_ms": round(entry["import_seconds"] * 1000, 1),
+            "init_ms": round((entry["init_seconds"] or 0) * 1000, 1),
+            "load_ms": round(entry["seconds"] * 1000, 1),
+        }
+        for name, entry in warmup()["components"].items()
+    }
+    failed = [name for name, entry in startup.items() if entry["status"] != "ready"]
+    if failed:
+        raise RuntimeError(f"Components failed to load: {failed}")
+
+    # ingest
+    timer = NodeTimer()
+    pipeline = build_pipeline(batch=True, node_wrapper=timer.wrap)
+    docs = synthetic_corpus(n_docs)
+    batches = 0
+    start = time.perf_counter()
+    for batch in chunked(docs, batch_size):
+        pipeline.invoke({"articles": batch})
+        batches += 1
+    ingest_seconds = time.perf_counter() - start
+
+    # queries (one unrecorded pass first: lazy imports, first-touch pages)
+    engine = get_query_engine()
+    queries = query_set()
+    for q in queries:
+        engine.search(q, top_k=top_k)
+    search_times, rank_times = [], []
+    for _ in range(query_rounds):
+        for q in queries:
+            t0 = time.perf_counter()
+            engine.search(q, top_k=top_k)
+            search_times.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            engine.rank(q, top_k=top_k)
+            rank_times.append(time.perf_counter() - t0)
+
+    return {
+        "docs": n_docs,
+        "config": {
+            "EMBEDDING_MODEL": Config.EMBEDDING_MODEL,
+            "EMBEDDING_BACKEND": Config.EMBEDDING_BACKEND,
+            "EMBEDDING_BATCH_SIZE": Config.EMBEDDING_BATCH_SIZE,
+            "INGEST_BATCH_SIZE": batch_size,
+            "DEDUP_INDEX_ENABLED": Config.DEDUP_INDEX_ENABLED,
+            "HYBRID_SEARCH_ENABLED": Config.HYBRID_SEARCH_ENABLED,
+            "QUERY_CACHE_ENABLED": Config.QUERY_CACHE_ENABLED,
+            "LLM_ENRICH_ENABLED": Config.LLM_ENRICH_ENABLED,
+            "LLM_TOP_N": Config.LLM_TOP_N,
+        },
+        "startup": startup,
+        "ingest": {
+            "batches": batches,
+            "total_ms": round(ingest_seconds * 1000, 1),
+            "docs_per_sec": round(n_docs / ingest_seconds, 2),
+        },
+        "nodes": timer.report(n_docs, ingest_seconds),
+        "query": {
+            "search": latency_summary(search_times),
+            "rank": latency_summary(rank_times),
+        },
+    }
+
+
+# -----------------------------------
+# Driver
+# -----------------------------------
+def _worker_env(workdir: Path, ollama_url: str, args) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "CHROMA_DIR": str(workdir / "chroma"),
+        "DB_URL": f"sqlite:///{(workdir / 'news.db').as_posix()}",
+        "EMBEDDING_CACHE_DIR": str(workdir / "embedding_cache"),
+        "OLLAMA_URL": ollama_url,
+        "QUERY_CACHE_ENABLED": "1" if args.query_cache else "0",
+        "LLM_ENRICH_ENABLED": "1" if args.enrich else "0",
+        "LOG_LEVEL": args.log_level,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")])),
+    })
+    return env
+
+
+def run(args) -> dict:
+    from src.llm.stub_ollama import start_stub_server
+
+    server, ollama_url = start_stub_server(delay=args.llm_delay)
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sizes": args.sizes,
+            "batch_size": args.batch_size,
+            "query_rounds": args.query_rounds,
+            "top_k": args.top_k,
+            "llm_delay": args.llm_delay,
+        },
+        "runs": {},
+    }
+    try:
+        for n_docs in args.sizes:
+            workdir = Path(tempfile.mkdtemp(prefix=f"bench-{n_docs}-"))
+            try:
+                out = workdir / "result.json"
+                cmd = [
+                    sys.executable, "-m", "bench.perf_bench", "--worker",
+                    "--sizes", str(n_docs),
+                    "--batch-size", str(args.batch_size),
+                    "--query-rounds", str(args.query_rounds),
+                    "--top-k", str(args.top_k),
+                    "--result", str(out),
+                ]
+                print(f"[bench] {n_docs} docs in {workdir}")
+                subprocess.run(cmd, cwd=ROOT, env=_worker_env(workdir, ollama_url, args), check=True)
+                with open(out, "r", encoding="utf-8") as f:
+                    run_result = json.load(f)
+                results["runs"][str(n_docs)] = run_result
+                _print_run(run_result)
+            finally:
+                if not args.keep:
+                    shutil.rmtree(workdir, ignore_errors=True)
+    finally:
+        server.shutdown()
+    return results
+
+
+def _print_run(r: dict):
+    print(f"  ingest       {r['ingest']['docs_per_sec']:>10} docs/s  ({r['ingest']['total_ms'] / 1000:.1f}s)")
+    for name, node in r["nodes"].items():
+        print(f"  node {name:<8}{node['per_doc_ms']:>10} ms/doc  {node['share'] * 100:5.1f}%")
+    for kind in ("search", "rank"):
+        q = r["query"][kind]
+        print(f"  {kind:<13}p50 {q['p50_ms']} ms  p95 {q['p95_ms']} ms  p99 {q['p99_ms']} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingest and query performance")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000], help="corpus sizes")
+    parser.add_argument("--batch-size", type=int, default=32, help="articles per graph invocation")
+    parser.add_argument("--query-rounds", type=int, default=5, help="passes over the query set")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--llm-delay", type=float, default=0.0, help="stub LLM seconds per token")
+    parser.add_argument("--query-cache", action="store_true", help="keep the query result cache on")
+    parser.add_argument("--enrich", action="store_true", help="include the LLM enrichment node")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--keep", action="store_true", help="keep the temp dirs")
+    parser.add_argument("--out", default="bench/results/latest.json")
+    # internal: run one size in this process (set up by the driver)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(args.sizes[0], args.batch_size, args.query_rounds, args.top_k)
+        with open(args.result, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        return
+
+    results = run(args)
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved {out}")
+
+
+if __name__ == "__main__":
+    main()
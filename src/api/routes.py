@@ -1,27 +1,107 @@
-from fastapi import APIRouter
-from src.api.schemas import IngestRequest, QueryRequest, QueryResponse
-from src.pipeline.graph import build_pipeline
+import json
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from src.api import warmup as warmup_hooks
+from src.api.schemas import IngestRequest, IngestBatchRequest, QueryRequest, QueryResponse
+from src.pipeline.graph import get_pipeline
+from src.pipeline.ingest_queue import IngestQueue, QueueFullError
 from src.query.query_agent import QueryAgent
+from src.query.query_engine import resolve_date_range
+from src.utils.registry import registry, get_resource
 
 router = APIRouter()
 
-pipeline = build_pipeline()
+# Nothing heavy is built at import time: pipelines, models and clients
+# load on first use (or on POST /warmup)
 query_agent = QueryAgent()
 
 
+def get_ingest_queue() -> IngestQueue:
+    return get_resource("ingest_queue", lambda: IngestQueue(get_pipeline(batch=True)))
+
+
 @router.post("/ingest")
 def ingest_article(payload: IngestRequest):
     data = payload.dict()
-    enriched = pipeline.invoke(data)
+    enriched = get_pipeline().invoke(data)
     return {"status": "success", "article": enriched}
 
 
+@router.post("/ingest/batch", status_code=202)
+def ingest_batch(payload: IngestBatchRequest):
+    articles = [a.dict() for a in payload.articles]
+    if not articles:
+        raise HTTPException(status_code=400, detail="No articles supplied.")
+    try:
+        job_id = get_ingest_queue().submit(articles)
+    except QueueFullError as ex:
+        raise HTTPException(status_code=429, detail=str(ex), headers={"Retry-After": "1"})
+    return {"status": "accepted", "job_id": job_id, "queued": len(articles)}
+
+
+@router.get("/ingest/jobs/{job_id}")
+def ingest_job_status(job_id: str):
+    job = get_ingest_queue().get_job(job_id) if registry.is_loaded("ingest_queue") else None
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job id: {job_id}")
+    return job
+
+
 @router.post("/query", response_model=QueryResponse)
 def query_news(payload: QueryRequest):
-    answer = query_agent.run(payload.query)
+    since, until = _date_range(payload.since, payload.until)
+    answer = query_agent.run(payload.query, since=since, until=until)
     return QueryResponse(result=answer)
 
 
+def _date_range(since, until):
+    try:
+        return resolve_date_range(since, until)
+    except ValueError as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+
+
+def _sse(events):
+    # Server-Sent Events framing: one "event:" + "data:" block per event
+    for event, data in events:
+        yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.get("/query/stream")
+def query_news_stream(query: str, top_k: int = 10, since: str = None, until: str = None):
+    since, until = _date_range(since, until)
+    return StreamingResponse(
+        _sse(query_agent.stream(query, top_k=top_k, since=since, until=until)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/query/stats")
+def query_stats():
+    return query_agent.stats()
+
+
+@router.get("/resources")
+def loaded_resources():
+    # shared models/clients loaded so far, with load time and RSS added
+    return registry.stats()
+
+
+@router.post("/warmup")
+def warmup():
+    # load every heavy component now; returns the per-component timings
+    return warmup_hooks.warmup()
+
+
+@router.get("/ready")
+def ready():
+    # readiness (everything loaded) is separate from liveness (/health)
+    status = warmup_hooks.readiness()
+    status["report"] = warmup_hooks.report()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
 @router.get("/health")
 def health_check():
     return {"status": "ok"}
@@ -11,8 +11,15 @@ class IngestRequest(BaseModel):
     url: Optional[str] = None
 
 
+class IngestBatchRequest(BaseModel):
+    articles: List[IngestRequest]
+
+
 class QueryRequest(BaseModel):
     query: str
+    # publish-date bounds: epoch seconds, ISO-8601 or RFC-822 (inclusive)
+    since: Optional[str] = None
+    until: Optional[str] = None
 
 
 class QueryResponse(BaseModel):
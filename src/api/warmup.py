@@ -0,0 +1,137 @@
+# src/api/warmup.py
+
+import importlib
+import threading
+import time
+
+from src.config.config import Config
+from src.utils.logger import get_logger
+from src.utils.registry import registry
+
+logger = get_logger("Warmup")
+
+
+def timed_import(module: str) -> float:
+    """Seconds spent importing `module` now (~0 when it is already loaded)."""
+    start = time.perf_counter()
+    importlib.import_module(module)
+    return time.perf_counter() - start
+
+
+def _spacy():
+    from src.ner.spacy_model import get_nlp
+    get_nlp("en_core_web_sm")
+
+
+def _embedder():
+    from src.vector.vector_store import get_embedder
+    get_embedder()
+
+
+def _chroma():
+    from src.vector.vector_store import get_collection
+    get_collection()
+
+
+def _deduper():
+    from src.pipeline.agents import get_deduper
+    get_deduper()
+
+
+def _impact_mapper():
+    from src.pipeline.agents import get_mapper
+    get_mapper()
+
+
+def _pipelines():
+    from src.pipeline.graph import get_pipeline
+    get_pipeline()
+    get_pipeline(batch=True)
+
+
+def _query_engine():
+    from src.query.query_engine import get_query_engine
+    get_query_engine()
+
+
+# (component, modules it imports, registry keys that mark it loaded, loader);
+# dependencies first. The modules are imported (and timed) before the loader
+# runs, so the report splits import cost from init cost.
+COMPONENTS = [
+    ("spacy", ("spacy", "src.ner.spacy_model"), lambda: ["spacy:en_core_web_sm"], _spacy),
+    ("embedder", ("sentence_transformers", "src.vector.vector_store"), lambda: ["embedder"], _embedder),
+    ("chroma", ("chromadb",), lambda: [f"chroma_collection:{Config.CHROMA_DIR}:news_articles"], _chroma),
+    ("deduper", ("src.pipeline.agents",), lambda: ["deduper"], _deduper),
+    ("impact_mapper", ("src.impact.impact_mapper",), lambda: ["impact_mapper"], _impact_mapper),
+    ("pipelines", ("langgraph.graph", "src.pipeline.graph"), lambda: ["pipeline:single", "pipeline:batch"], _pipelines),
+    ("query_engine", ("src.query.query_engine",), lambda: ["query_engine"], _query_engine),
+]
+
+_lock = threading.Lock()
+_report = {"started_at": None, "finished_at": None, "components": {}}
+
+
+def warmup() -> dict:
+    """
+    Load every heavy component now (each one at most once per process)
+    and return the per-component timing report: seconds per imported
+    module, import_seconds, init_seconds and their total (seconds).
+    """
+    with _lock:
+        _report["started_at"] = _report["started_at"] or time.time()
+        for name, modules, _, load in COMPONENTS:
+            entry = _report["components"].get(name)
+            if entry and entry["status"] == "ready":
+                continue
+            entry = {"status": "ready", "imports": {}, "init_seconds": None}
+            start = time.perf_counter()
+            try:
+                for module in modules:
+                    entry["imports"][module] = round(timed_import(module), 3)
+                init_start = time.perf_counter()
+                load()
+                entry["init_seconds"] = round(time.perf_counter() - init_start, 3)
+            except Exception as ex:
+                logger.exception(f"Warmup failed for {name}: {ex}")
+                entry.update(status="failed", error=str(ex))
+            entry["import_seconds"] = round(sum(entry["imports"].values()), 3)
+            entry["seconds"] = round(time.perf_counter() - start, 3)
+            _report["components"][name] = entry
+        _report["finished_at"] = time.time()
+        _log_report()
+        return report()
+
+
+def warmup_in_background():
+    threading.Thread(target=warmup, name="warmup", daemon=True).start()
+
+
+def readiness() -> dict:
+    """
+    Which components are loaded (by warmup or by traffic); ready only when
+    all of them are.
+    """
+    loaded = {
+        name: all(registry.is_loaded(key) for key in keys())
+        for name, _, keys, _ in COMPONENTS
+    }
+    return {"ready": all(loaded.values()), "components": loaded}
+
+
+def report() -> dict:
+    return {
+        "started_at": _report["started_at"],
+        "finished_at": _report["finished_at"],
+        "components": {name: dict(entry) for name, entry in _report["components"].items()},
+        "resources": registry.stats(),
+    }
+
+
+def _log_report():
+    lines = [f"  {'':<14} {'':<7} {'import':>8} {'init':>8} {'total':>8}"]
+    for name, e in _report["components"].items():
+        init = f"{e['init_seconds']:>7.3f}s" if e["init_seconds"] is not None else f"{'-':>8}"
+        lines.append(f"  {name:<14} {e['status']:<7} {e['import_seconds']:>7.3f}s {init} {e['seconds']:>7.3f}s")
+    total = sum(e["seconds"] for e in _report["components"].values())
+    lines.append(f"  {'total':<14} {'':<7} {'':>8} {'':>8} {total:>7.3f}s")
+    logger.info("Warmup report:\n" + "\n".join(lines))
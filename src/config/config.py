@@ -9,10 +9,86 @@ class Config:
 
     # Embeddings
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    # torch | onnx | onnx-int8 (ONNX backends run on onnxruntime, CPU friendly)
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+    EMBEDDING_NORMALIZE = os.getenv("EMBEDDING_NORMALIZE", "1") == "1"
+    EMBEDDING_MAX_SEQ_LENGTH = int(os.getenv("EMBEDDING_MAX_SEQ_LENGTH", 0))  # 0 = model default
+    EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE", "")  # "" = auto, e.g. "cpu"
+    # ONNX model file inside the model repo (e.g. onnx/model_qint8_avx512_vnni.onnx);
+    # for onnx-int8 without a published file, the model is quantised for
+    # EMBEDDING_ONNX_QUANTIZATION (arm64 | avx2 | avx512 | avx512_vnni) into EMBEDDING_ONNX_DIR
+    EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "")
+    EMBEDDING_ONNX_QUANTIZATION = os.getenv("EMBEDDING_ONNX_QUANTIZATION", "avx2")
+    EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", "embedding_models")
+
+    # On-disk embedding cache (content-addressed, LRU bounded)
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "1") == "1"
+    EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "embedding_cache")
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 200000))
+
+    # Company → ticker mapping (names, aliases, tickers, sectors)
+    COMPANY_MAPPING_CSV = os.getenv("COMPANY_MAPPING_CSV", "data/company_to_ticker.csv")
+    IMPACT_MATCH_ALIASES = os.getenv("IMPACT_MATCH_ALIASES", "0") == "1"
 
     # Dedup thresholds
     DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.90))
+
+    # In-memory dedupe index over the most recent articles
+    DEDUP_INDEX_ENABLED = os.getenv("DEDUP_INDEX_ENABLED", "1") == "1"
+    DEDUP_INDEX_SIZE = int(os.getenv("DEDUP_INDEX_SIZE", 50000))
+
+    # SimHash near-exact prefilter (runs before embedding)
+    DEDUP_FINGERPRINT_ENABLED = os.getenv("DEDUP_FINGERPRINT_ENABLED", "1") == "1"
+    DEDUP_SIMHASH_MAX_DISTANCE = int(os.getenv("DEDUP_SIMHASH_MAX_DISTANCE", 3))
+    DEDUP_SIMHASH_SHINGLE = int(os.getenv("DEDUP_SIMHASH_SHINGLE", 3))
+
+    # Batch NER (spaCy nlp.pipe)
+    NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", 64))
+    NER_N_PROCESS = int(os.getenv("NER_N_PROCESS", 1))
+    NER_FUZZY_CACHE_SIZE = int(os.getenv("NER_FUZZY_CACHE_SIZE", 50000))
+    NER_FUZZY_CDIST_MIN = int(os.getenv("NER_FUZZY_CDIST_MIN", 8))
+
+    # Batch ingestion (articles per pipeline invocation)
+    INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 32))
+
+    # Async bulk ingestion (POST /ingest/batch)
+    INGEST_QUEUE_MAXSIZE = int(os.getenv("INGEST_QUEUE_MAXSIZE", 1000))
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 1))
+    INGEST_BATCH_WAIT = float(os.getenv("INGEST_BATCH_WAIT", 0.5))  # seconds to fill a batch
     
+    # Hybrid retrieval: SQLite FTS5 (BM25) fused with vector hits (RRF)
+    HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "1") == "1"
+    HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", 60))
+
+    # Extra candidates: newest articles impacting the query's tickers (0 = off)
+    TICKER_CANDIDATES_LIMIT = int(os.getenv("TICKER_CANDIDATES_LIMIT", 10))
+
+    # Query result cache (TTL + LRU, invalidated on ingest)
+    QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "1") == "1"
+    QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", 300))
+    QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", 1024))
+
+    # Local LLM (Ollama generate endpoint)
+    OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate")
+
+    # Query-time LLM calls (summaries/explanations for the top results)
+    LLM_TOP_N = int(os.getenv("LLM_TOP_N", 2))
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+    # Seconds one query may take end to end before pending LLM answers are
+    # replaced by a placeholder (<= 0 waits for every call)
+    LLM_QUERY_BUDGET = float(os.getenv("LLM_QUERY_BUDGET", 30))
+
+    # Stored LLM summaries / explanations (read before any live call)
+    LLM_STORE_ENABLED = os.getenv("LLM_STORE_ENABLED", "1") == "1"
+    # Background enrichment stage after storage (precomputes the above)
+    LLM_ENRICH_ENABLED = os.getenv("LLM_ENRICH_ENABLED", "0") == "1"
+    LLM_ENRICH_QUEUE_MAXSIZE = int(os.getenv("LLM_ENRICH_QUEUE_MAXSIZE", 1000))
+    LLM_ENRICH_WORKERS = int(os.getenv("LLM_ENRICH_WORKERS", 1))
+
+    # Load all models/clients in the background when the API starts
+    WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "0") == "1"
+
     # Database
     DB_URL = os.getenv("DB_URL", "sqlite:///C:/financial_news_intel/news.db")
 
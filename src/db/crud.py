@@ -1,11 +1,24 @@
 # src/db/crud.py
 
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.orm import Session
 from src.db import models
+from src.utils import published_ts
 
-def upsert_article(db: Session, doc: dict):
+# keep IN (...) lists under SQLite's bound-parameter limit
+_IN_CHUNK = 500
+
+
+def _chunks(items, size=_IN_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def upsert_article(db: Session, doc: dict, commit: bool = True):
     """
     Insert or update an article and its entities + impacts.
+    Pass commit=False to keep several upserts in one transaction;
+    the caller is then responsible for db.commit().
     """
     article = db.query(models.Article).filter(
         models.Article.id == doc["id"]
@@ -22,6 +35,7 @@ def upsert_article(db: Session, doc: dict):
     article.url = doc.get("url")
     article.source = doc.get("source")
     article.published = doc.get("published")
+    article.published_ts = published_ts(doc)
 
     # Clear old entities + impacts (safe upsert)
     db.query(models.Entity).filter(
@@ -53,5 +67,119 @@ def upsert_article(db: Session, doc: dict):
         )
         db.add(im)
 
-    db.commit()
+    if commit:
+        db.commit()
+    else:
+        # make the row visible to later upserts in the same transaction
+        db.flush()
     return article
+
+
+def bulk_upsert_articles(db: Session, docs: list, commit: bool = True):
+    """
+    Set-based upsert for a batch of articles + their entities + impacts:
+    one SELECT for existing ids, bulk INSERT/UPDATE of articles,
+    set-based DELETE of old entities/impacts, executemany INSERTs,
+    and a single commit for the whole batch.
+    Later docs win when the same id appears twice in `docs`.
+    """
+    by_id = {}
+    for doc in docs:
+        by_id[doc["id"]] = doc
+    if not by_id:
+        return 0
+    ids = list(by_id)
+
+    existing = set()
+    for part in _chunks(ids):
+        existing.update(db.scalars(
+            select(models.Article.id).where(models.Article.id.in_(part))
+        ))
+
+    rows = [
+        {
+            "id": doc_id,
+            "story_id": str(doc.get("story_id")),
+            "title": doc.get("title"),
+            "description": doc.get("description"),
+            "url": doc.get("url"),
+            "source": doc.get("source"),
+            "published": doc.get("published"),
+            "published_ts": published_ts(doc),
+        }
+        for doc_id, doc in by_id.items()
+    ]
+    new_rows = [r for r in rows if r["id"] not in existing]
+    old_rows = [r for r in rows if r["id"] in existing]
+
+    if new_rows:
+        db.execute(insert(models.Article), new_rows)
+    if old_rows:
+        db.execute(update(models.Article), old_rows)
+
+    # Clear old entities + impacts for every id at once
+    for part in _chunks(ids):
+        db.execute(delete(models.Entity).where(models.Entity.article_id.in_(part)))
+        db.execute(delete(models.Impact).where(models.Impact.article_id.in_(part)))
+
+    entity_rows = [
+        {
+            "article_id": doc_id,
+            "text": e.get("text"),
+            "label": e.get("label"),
+            "source": e.get("source"),
+        }
+        for doc_id, doc in by_id.items()
+        for e in doc.get("entities", [])
+    ]
+    impact_rows = [
+        {
+            "article_id": doc_id,
+            "ticker": imp.get("ticker"),
+            "company": imp.get("company"),
+            "confidence": imp.get("confidence"),
+            "impact_type": imp.get("type"),
+        }
+        for doc_id, doc in by_id.items()
+        for imp in doc.get("impacts", [])
+    ]
+    if entity_rows:
+        db.execute(insert(models.Entity), entity_rows)
+    if impact_rows:
+        db.execute(insert(models.Impact), impact_rows)
+
+    if commit:
+        db.commit()
+    return len(ids)
+
+
+def published_range(stmt, since: int = None, until: int = None):
+    """Add an inclusive articles.published_ts range (epoch seconds) to stmt."""
+    if since is not None:
+        stmt = stmt.where(models.Article.published_ts >= since)
+    if until is not None:
+        stmt = stmt.where(models.Article.published_ts <= until)
+    return stmt
+
+
+def article_ids_for_tickers(db: Session, tickers, limit: int = 10, since: int = None, until: int = None):
+    """
+    Ids of the most recently published articles with an impact on any of
+    `tickers`, newest first (served by the impacts (ticker, article_id) index),
+    optionally restricted to a published_ts range.
+    """
+    tickers = list(tickers)
+    if not tickers:
+        return []
+    impacted = select(models.Impact.article_id).where(models.Impact.ticker.in_(tickers))
+    stmt = (
+        select(models.Article.id)
+        .where(models.Article.id.in_(impacted))
+        .order_by(
+            models.Article.published_ts.desc(),
+            models.Article.created_at.desc(),
+            models.Article.id.desc()
+        )
+        .limit(limit)
+    )
+    return list(db.scalars(published_range(stmt, since, until)))
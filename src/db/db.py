@@ -1,6 +1,7 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from src.config.config import Config
+from src.db.migrations import upgrade
 
 # Database URL (default sqlite:///news.db)
 DB_URL = Config.DB_URL
@@ -11,6 +12,23 @@ engine = create_engine(
     future=True
 )
 
+
+if DB_URL.startswith("sqlite"):
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL: readers don't block the writer; NORMAL: fsync at checkpoints only
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+
+@event.listens_for(engine, "first_connect")
+def _migrate(dbapi_connection, connection_record):
+    # older databases: bring the schema up to date before first use
+    upgrade(dbapi_connection, engine.dialect.name, engine.dialect.paramstyle)
+
+
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
@@ -0,0 +1,128 @@
+# src/db/fts.py
+
+import re
+import threading
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from src.utils.logger import get_logger
+
+logger = get_logger("ArticleFTS")
+
+FTS_TABLE = "articles_fts"
+# bm25 column weights (title, description): title hits count double
+BM25_WEIGHTS = (2.0, 1.0)
+
+_TOKEN_RE = re.compile(r"\w+")
+_ready = set()
+_ready_lock = threading.Lock()
+
+
+def fts_supported(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def ensure_fts(bind) -> bool:
+    """
+    Create the FTS5 index next to `articles` on first use (backfilled from
+    the existing rows), on its own connection. Returns False on databases
+    without FTS5.
+    """
+    if not fts_supported(bind):
+        return False
+    url = str(bind.url)
+    if url in _ready:
+        return True
+    with _ready_lock:
+        if url in _ready:
+            return True
+        with bind.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": FTS_TABLE}
+            ).first()
+            if not exists:
+                conn.execute(text(
+                    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, description)"
+                ))
+                has_articles = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles'")
+                ).first()
+                if has_articles:
+                    conn.execute(text(
+                        f"INSERT INTO {FTS_TABLE}(rowid, title, description) "
+                        "SELECT id, coalesce(title, ''), coalesce(description, '') FROM articles"
+                    ))
+                logger.info(f"Created {FTS_TABLE} full-text index")
+        _ready.add(url)
+    return True
+
+
+def index_articles(db: Session, docs: list):
+    """
+    Incrementally (re)index a batch of articles in the caller's
+    transaction; the caller commits. Call it before the transaction's
+    other writes: the first call may create the index on a second
+    connection.
+    """
+    by_id = {int(doc["id"]): doc for doc in docs}
+    if not by_id or not ensure_fts(db.get_bind()):
+        return 0
+    db.execute(
+        text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"),
+        [{"id": doc_id} for doc_id in by_id]
+    )
+    db.execute(
+        text(f"INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (:id, :title, :description)"),
+        [
+            {"id": doc_id, "title": doc.get("title") or "", "description": doc.get("description") or ""}
+            for doc_id, doc in by_id.items()
+        ]
+    )
+    return len(by_id)
+
+
+def build_match_query(query: str):
+    """
+    Free text → FTS5 MATCH expression: every word quoted (so punctuation
+    and FTS operators in user input are inert), OR-ed together for BM25.
+    """
+    tokens = list(dict.fromkeys(t.lower() for t in _TOKEN_RE.findall(query or "")))
+    if not tokens:
+        return None
+    return " OR ".join(f'"{t}"' for t in tokens)
+
+
+def search(
+    db: Session,
+    query: str,
+    limit: int = 10,
+    since: int = None,
+    until: int = None
+) -> List[Tuple[str, float]]:
+    """
+    BM25 top-`limit` over title + description as [(article_id, score)],
+    best first (scores are bm25(): lower is better). since/until restrict
+    hits to an articles.published_ts range (epoch seconds, inclusive).
+    """
+    match = build_match_query(query)
+    if match is None or not ensure_fts(db.get_bind()):
+        return []
+    params = {"match": match, "limit": limit}
+    sql = (
+        f"SELECT f.rowid, bm25({FTS_TABLE}, {BM25_WEIGHTS[0]}, {BM25_WEIGHTS[1]}) AS score "
+        f"FROM {FTS_TABLE} AS f"
+    )
+    where = [f"{FTS_TABLE} MATCH :match"]
+    if since is not None or until is not None:
+        sql += " JOIN articles AS a ON a.id = f.rowid"
+        if since is not None:
+            where.append("a.published_ts >= :since")
+            params["since"] = since
+        if until is not None:
+            where.append("a.published_ts <= :until")
+            params["until"] = until
+    sql += " WHERE " + " AND ".join(where) + " ORDER BY score LIMIT :limit"
+    rows = db.execute(text(sql), params)
+    return [(str(rowid), score) for rowid, score in rows]
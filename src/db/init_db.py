@@ -2,12 +2,17 @@
 
 from src.db.db import engine, Base
 from src.db import models  # <-- REQUIRED to register models
+from src.db.fts import ensure_fts
 from src.config.config import Config
 
+
 def init_db():
     print("DB URL =", Config.DB_URL)
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
+    # existing databases get newer columns/indexes on first connection
+    # (see src.db.migrations)
+    ensure_fts(engine)  # SQLite only: FTS5 index over title + description
     print("Database ready.")
 
 if __name__ == "__main__":
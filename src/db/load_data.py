@@ -1,9 +1,11 @@
 # src/db/load_data.py
 
-import json
 from pathlib import Path
 from src.db.db import SessionLocal
-from src.db.crud import upsert_article
+from src.db.crud import bulk_upsert_articles
+from src.db.fts import index_articles
+from src.utils import chunked
+from src.utils.json_stream import iter_articles
 from src.utils.logger import get_logger
 from src.config.config import Config
 print("DB URL used by load_data:", Config.DB_URL)
@@ -11,23 +13,22 @@ print("DB URL used by load_data:", Config.DB_URL)
 logger = get_logger("load_data")
 
 
-def load(input_path: str = "data/news_final_enriched.json"):
+def load(input_path: str = "data/news_final_enriched.json", batch_size: int | None = None):
     path = Path(input_path)
 
     if not path.exists():
         raise FileNotFoundError(f"Input dataset not found: {path.resolve()}")
 
-    with open(path, "r", encoding="utf-8") as f:
-        docs = json.load(f)
+    batch_size = batch_size or Config.INGEST_BATCH_SIZE
+    count = 0
 
-    db = SessionLocal()
+    # one transaction per batch
+    with SessionLocal() as db:
+        for batch in chunked(iter_articles(path), batch_size):
+            index_articles(db, batch)
+            count += bulk_upsert_articles(db, batch)
 
-    for d in docs:
-        upsert_article(db, d)
-
-    db.close()
-
-    logger.info(f"Loaded {len(docs)} articles into the database.")
+    logger.info(f"Loaded {count} articles into the database.")
 
 
 if __name__ == "__main__":
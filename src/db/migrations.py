@@ -0,0 +1,120 @@
+# src/db/migrations.py
+"""
+Idempotent upgrades for databases created by older versions. The SQL ones
+run on the engine's first connection (see src.db.db), before any session
+uses it, and the Chroma one when the collection is first opened (see
+src.vector.vector_store), so every entry point (API, batch ingest,
+load_data, queries) sees the current schema without a separate
+`python -m src.db.init_db` step.
+"""
+
+from pathlib import Path
+
+from src.utils import parse_timestamp
+from src.utils.logger import get_logger
+
+logger = get_logger("DBMigrations")
+
+
+def _columns(cursor, dialect: str, table: str) -> set:
+    if dialect == "sqlite":
+        cursor.execute(f"PRAGMA table_info({table})")
+        return {row[1] for row in cursor.fetchall()}
+    cursor.execute(
+        "SELECT column_name FROM information_schema.columns WHERE table_name = %s", (table,)
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def upgrade(dbapi_connection, dialect: str, paramstyle: str):
+    """Run every SQL migration, in order."""
+    add_published_ts(dbapi_connection, dialect, paramstyle)
+    add_impacts_ticker_index(dbapi_connection, dialect)
+
+
+def add_impacts_ticker_index(dbapi_connection, dialect: str):
+    """(ticker, article_id) index on impacts, used by query candidate generation."""
+    cursor = dbapi_connection.cursor()
+    try:
+        if not _columns(cursor, dialect, "impacts"):
+            return
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ix_impacts_ticker_article ON impacts (ticker, article_id)"
+        )
+        dbapi_connection.commit()
+    except Exception:
+        dbapi_connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def add_published_ts(dbapi_connection, dialect: str, paramstyle: str):
+    """
+    articles.published_ts (epoch seconds): add the column and its index
+    when missing, then backfill it from the stored `published` strings.
+    A fresh database is left alone (create_all builds the current schema).
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        columns = _columns(cursor, dialect, "articles")
+        if not columns:
+            return
+        if "published_ts" not in columns:
+            cursor.execute("ALTER TABLE articles ADD COLUMN published_ts INTEGER")
+            logger.info("Added articles.published_ts")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_articles_published_ts ON articles (published_ts)")
+
+        cursor.execute(
+            "SELECT id, published FROM articles WHERE published_ts IS NULL AND published IS NOT NULL"
+        )
+        values = [
+            (ts, art_id)
+            for art_id, pub in cursor.fetchall()
+            if (ts := parse_timestamp(pub)) is not None
+        ]
+        if values:
+            p = "?" if paramstyle == "qmark" else "%s"
+            cursor.executemany(f"UPDATE articles SET published_ts = {p} WHERE id = {p}", values)
+            logger.info(f"Backfilled published_ts for {len(values)} articles")
+        dbapi_connection.commit()
+    except Exception:
+        dbapi_connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def backfill_chroma_published_ts(collection, marker, page_size: int = 1000) -> int:
+    """
+    Add the numeric published_ts metadata key (what since/until queries
+    filter on) to vectors indexed before it existed, parsed from their
+    `published` metadata. Pages through the collection once, then writes
+    `marker` so later starts skip the scan. Returns the rows updated.
+    """
+    marker = Path(marker)
+    if marker.exists():
+        return 0
+
+    updated = 0
+    total = collection.count()
+    for offset in range(0, total, page_size):
+        resp = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+        ids, metadatas = [], []
+        for doc_id, meta in zip(resp.get("ids") or [], resp.get("metadatas") or []):
+            meta = meta or {}
+            if "published_ts" in meta:
+                continue
+            ts = parse_timestamp(meta.get("published"))
+            if ts is not None:
+                ids.append(doc_id)
+                metadatas.append({**meta, "published_ts": ts})
+        if ids:
+            collection.update(ids=ids, metadatas=metadatas)
+            updated += len(ids)
+
+    if updated:
+        logger.info(f"Backfilled published_ts metadata for {updated} Chroma vectors")
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    marker.touch()
+    return updated
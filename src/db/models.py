@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime, ForeignKey, Float
+    Column, Integer, String, Text, DateTime, ForeignKey, Float, UniqueConstraint, Index
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -15,6 +15,7 @@ class Article(Base):
     url = Column(String)
     source = Column(String)
     published = Column(String)   # store as original string
+    published_ts = Column(Integer, index=True)  # epoch seconds (UTC) parsed from published
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # relationships
@@ -36,6 +37,10 @@ class Entity(Base):
 
 class Impact(Base):
     __tablename__ = "impacts"
+    __table_args__ = (
+        # ticker → article lookups for query candidate generation
+        Index("ix_impacts_ticker_article", "ticker", "article_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     article_id = Column(Integer, ForeignKey("articles.id"))
@@ -45,3 +50,28 @@ class Impact(Base):
     impact_type = Column(String)  # direct, sector, regulatory
 
     article = relationship("Article", back_populates="impacts")
+
+
+class LLMOutput(Base):
+    """
+    Stored LLM summary / impact explanation for one article version.
+    A row is valid only for the exact content, prompt version and model
+    it was generated with.
+    """
+    __tablename__ = "llm_outputs"
+    __table_args__ = (
+        UniqueConstraint(
+            "article_id", "kind", "subject", "content_hash", "prompt_version", "model",
+            name="uq_llm_outputs_key"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    article_id = Column(String, index=True)
+    kind = Column(String)         # summary, explanation
+    subject = Column(String, default="")  # company (explanations only)
+    content_hash = Column(String)
+    prompt_version = Column(String)
+    model = Column(String)
+    text = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
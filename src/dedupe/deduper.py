@@ -1,134 +1,204 @@
 # src/dedupe/deduper.py
 from typing import Optional, Dict, Any, List, Tuple
 import numpy as np
-from src.vector.vector_store import VectorStore
+from src.vector.vector_store import VectorStore, as_matrix, normalize_rows
+from src.dedupe.recent_index import RecentEmbeddingIndex
+from src.dedupe.fingerprint import SimHashIndex, simhash
 from src.utils.logger import get_logger
-from src.utils import canonical_text
+from src.utils import canonical_text, published_ts
 from src.config.config import Config
 
 
 
 logger = get_logger("Deduper")
 
-def flatten_embedding(emb):
+def best_match(query: np.ndarray, cand_ids: List[str], candidates: np.ndarray) -> Tuple[Optional[str], float]:
     """
-    Handle ChromaDB embedding formats safely:
-    - [[...]] nested list
-    - [...] flat list
-    - None or empty → return None
+    Most similar candidate for one L2-normalised query row: cosine is a dot
+    product against the (normalised) candidate rows. (None, 0.0) when no
+    candidate is positively similar.
     """
-    if emb is None:
-        return None
-    if isinstance(emb, list):
-        if len(emb) == 0:
-            return None
-        # case 1: nested like [[vector]]
-        if isinstance(emb[0], list):
-            return emb[0]
-        # case 2: already flat
-        return emb
-    return None
-
-
-def cosine_similarity(a: List[float], b: List[float]) -> float:
-    # Fix nested embedding list issue from ChromaDB 1.3+
-    a = flatten_embedding(a)
-    b = flatten_embedding(b)
-    if a is None or b is None:
-        return 0.0
-    a = np.array(a, dtype=float)
-    b = np.array(b, dtype=float)
-
-    if np.all(a == 0) or np.all(b == 0):
-        return 0.0
-
-    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+    if not cand_ids:
+        return None, 0.0
+    sims = candidates @ query
+    j = int(sims.argmax())
+    if sims[j] <= 0.0:
+        return None, 0.0
+    return cand_ids[j], float(sims[j])
 
 class Deduper:
     """
-    Deduper that uses VectorStore (Chroma) to find near neighbours,
-    computes cosine similarity against returned candidate embeddings,
-    and decides duplicates based on Config.DEDUP_THRESHOLD.
+    Deduper that finds near neighbours of a doc, computes cosine similarity
+    against them, and decides duplicates based on Config.DEDUP_THRESHOLD.
+
+    By default neighbours come from an in-memory RecentEmbeddingIndex over
+    the most recent articles (warmed from Chroma at start). With
+    use_index=False every check queries VectorStore (Chroma) instead.
+
+    Before any embedding is computed, a SimHash fingerprint of the text is
+    checked against recent fingerprints: near-exact copies (syndicated wire
+    stories) are resolved there and reuse the original's stored embedding,
+    so only the remaining articles go through the model + semantic check.
     """
 
-    def __init__(self, top_k: int = 5, threshold: float | None = None):
+    def __init__(
+        self,
+        top_k: int = 5,
+        threshold: float | None = None,
+        use_index: bool | None = None,
+        use_fingerprints: bool | None = None
+    ):
         self.vs = VectorStore()
         self.top_k = top_k
         self.threshold = threshold if threshold is not None else Config.DEDUP_THRESHOLD
         self.collection = self.vs.collection
         self.embedder = self.vs.embedder
-        logger.info(f"Deduper initialized: top_k={self.top_k} threshold={self.threshold}")
 
-    def _get_candidate_ids(self, text: str) -> List[str]:
-        # query with embedding to get candidate ids (may return [] if none)
-        res = self.collection.query(
-            query_embeddings=[self.embedder.embed_text(text)],
-            n_results=self.top_k,
-            where=None
+        use_index = Config.DEDUP_INDEX_ENABLED if use_index is None else use_index
+        use_fingerprints = Config.DEDUP_FINGERPRINT_ENABLED if use_fingerprints is None else use_fingerprints
+        self.index = RecentEmbeddingIndex(Config.DEDUP_INDEX_SIZE) if use_index else None
+        self.fingerprints = (
+            SimHashIndex(Config.DEDUP_SIMHASH_MAX_DISTANCE, Config.DEDUP_INDEX_SIZE)
+            if use_fingerprints else None
         )
-        # ids is nested: list of lists
-        ids = res.get("ids", [[]])[0]
-        return ids or []
+        if self.index is not None or self.fingerprints is not None:
+            try:
+                self._warm_from_collection()
+            except Exception as e:
+                logger.warning(f"Could not warm dedupe indexes from Chroma: {e}")
+        logger.info(
+            f"Deduper initialized: top_k={self.top_k} threshold={self.threshold} "
+            f"index={'on' if self.index is not None else 'off'} "
+            f"fingerprints={'on' if self.fingerprints is not None else 'off'}"
+        )
+
+    def _recent_pages(self, include: List[str], page_size: int = 5000):
+        """
+        Yield Chroma pages over the newest DEDUP_INDEX_SIZE rows, oldest
+        first (so the ring buffers end up holding the most recent ones).
+        Chroma pages in insertion order: the window starts at count - size.
+        """
+        total = self.collection.count()
+        offset = max(0, total - Config.DEDUP_INDEX_SIZE)
+        while offset < total:
+            limit = min(page_size, total - offset)
+            resp = self.collection.get(include=include, limit=limit, offset=offset)
+            ids = resp.get("ids") or []
+            if not ids:
+                break
+            yield ids, resp
+            if len(ids) < limit:
+                break
+            offset += limit
 
-    def _get_embeddings_by_ids(self, ids: List[str]) -> Dict[str, List[float]]:
+    def _warm_from_collection(self, page_size: int = 5000):
         """
-        Fetch stored embeddings for the given ids using collection.get.
-        Returns dict id -> embedding (list)
+        Fill the in-memory indexes (embeddings and SimHash fingerprints)
+        from the newest DEDUP_INDEX_SIZE rows in Chroma.
         """
-        if not ids:
-            return {}
-        resp = self.collection.get(ids=ids, include=["embeddings", "metadatas", "documents"])
-        # resp['embeddings'] is nested list: [[emb1, emb2,...]]
-        emb_list = resp.get("embeddings", [[]])[0]
-        id_list = resp.get("ids", [[]])[0]
-        clean_map = {}
-        for i, emb in zip(id_list, emb_list):
-            emb = flatten_embedding(emb)
+        include = []
+        if self.index is not None:
+            include.append("embeddings")
+        if self.fingerprints is not None:
+            include.append("documents")
+
+        # one pass over the newest window fills both indexes
+        for ids, resp in self._recent_pages(include, page_size):
+            if self.index is not None:
+                embs = resp.get("embeddings")
+                if embs is not None and len(embs) == len(ids):
+                    self.index.add(ids, embs)
+            if self.fingerprints is not None:
+                for doc_id, text in zip(ids, resp.get("documents") or []):
+                    self.fingerprints.add(doc_id, self._fingerprint(text))
+
+        logger.info(
+            f"Dedupe indexes warmed: {len(self.index) if self.index is not None else 0} embeddings, "
+            f"{len(self.fingerprints) if self.fingerprints is not None else 0} fingerprints"
+        )
+
+    # -----------------------------------
+    # Lexical near-exact prefilter
+    # -----------------------------------
+    @staticmethod
+    def _fingerprint(text: str) -> Optional[int]:
+        return simhash(text, Config.DEDUP_SIMHASH_SHINGLE) if text else None
+
+    def _near_exact(self, fp: Optional[int], doc_id=None) -> Optional[Dict[str, Any]]:
+        # an article never matches its own earlier entry (e.g. from a failed
+        # batch that is being retried, or a re-ingest of the same id)
+        if self.fingerprints is None or fp is None:
+            return None
+        match_id, dist = self.fingerprints.find(fp, exclude=doc_id)
+        if match_id is None:
+            return None
+        return {
+            "duplicate_of": match_id,
+            "similarity": round(1.0 - dist / 64, 4),
+            "method": "simhash",
+            "hamming_distance": dist,
+        }
+
+    def _stored_embedding(self, doc_id: str) -> Optional[np.ndarray]:
+        """Embedding already stored for doc_id (hot index first, then Chroma)."""
+        if self.index is not None:
+            emb = self.index.get(doc_id)
             if emb is not None:
-                clean_map[i] = emb
-        return clean_map
+                return emb
+        return self.vs.get_embeddings([doc_id]).get(doc_id)
+
+    def _get_candidate_ids(self, text: str, embedding: Optional[np.ndarray] = None) -> List[str]:
+        # query with embedding to get candidate ids (may return [] if none)
+        if embedding is None:
+            embedding = self.embedder.embed_text(text)
+        res = self.vs.query_embedding(embedding, top_k=self.top_k, include=["distances"])
+        # ids is nested: list of lists
+        ids = res.get("ids", [[]])[0]
+        return ids or []
+
+    def _candidate_matrix(self, ids: List[str]) -> Tuple[List[str], np.ndarray]:
+        """Stored embeddings for ids (those Chroma has) as normalised rows."""
+        stored = self.vs.get_embeddings(ids)
+        found = [i for i in ids if i in stored]
+        if not found:
+            return [], np.empty((0, 0), dtype=np.float32)
+        return found, normalize_rows([stored[i] for i in found])
 
-    def is_duplicate(self, doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def is_duplicate(self, doc: Dict[str, Any], embedding: Optional[np.ndarray] = None) -> Optional[Dict[str, Any]]:
         """
         Returns dictionary {'duplicate_of': id, 'similarity': sim} if duplicate found,
-        otherwise None.
+        otherwise None. Pass `embedding` (of canonical_text(doc)) to skip re-encoding.
         """
         text = canonical_text(doc)
         if not text:
             return None
 
-        # 1) get candidate ids
-        candidate_ids = self._get_candidate_ids(text)
-        if not candidate_ids:
-            return None
-
-        # 2) fetch embeddings for candidates
-        cand_emb_map = self._get_embeddings_by_ids(candidate_ids)
+        # 1) doc embedding (computed once, reused for query + scoring)
+        doc_emb = embedding if embedding is not None else self.embedder.embed_text(text)
 
-        # 3) compute doc embedding
-        doc_emb = self.embedder.embed_text(text)
-
-        # 4) compute cosine similarities
-        best_sim = 0.0
-        best_id = None
-        for cid, cemb in cand_emb_map.items():
-            sim = cosine_similarity(doc_emb, cemb)
-            if sim > best_sim:
-                best_sim = sim
-                best_id = cid
+        # 2) best neighbour: in-memory index (one mat-vec) or Chroma round trips
+        q = normalize_rows(doc_emb)
+        if self.index is not None:
+            best_ids, best_sims = self.index.search(q, normalized=True, exclude=[doc.get("id")])
+            best_id, best_sim = best_ids[0], float(best_sims[0])
+        else:
+            best_id, best_sim = self._best_chroma_match(text, q[0], doc.get("id"))
 
         logger.debug(f"Doc {doc.get('id')} best_sim={best_sim} best_id={best_id}")
 
-        if best_sim >= self.threshold:
+        if best_id is not None and best_sim >= self.threshold:
             return {"duplicate_of": best_id, "similarity": best_sim}
         return None
 
-    def assign_story_id_and_update(self, doc: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Determine story_id for doc and update chroma metadata for that doc entry.
-        Returns updated doc (with 'story_id' set).
-        """
-        dup = self.is_duplicate(doc)
+    def _best_chroma_match(self, text: str, q: np.ndarray, doc_id=None) -> Tuple[Optional[str], float]:
+        # 1) get candidate ids, 2) their stored embeddings, 3) one mat-vec
+        candidate_ids = [cid for cid in self._get_candidate_ids(text, q) if cid != str(doc_id)]
+        if not candidate_ids:
+            return None, 0.0
+        return best_match(q, *self._candidate_matrix(candidate_ids))
+
+    @staticmethod
+    def _mark_story(doc: Dict[str, Any], dup: Optional[Dict[str, Any]]) -> None:
         if dup:
             doc["story_id"] = dup["duplicate_of"]
             doc["_dedupe_info"] = {"duplicate": True, **dup}
@@ -138,9 +208,8 @@ class Deduper:
             doc["_dedupe_info"] = {"duplicate": False, "similarity": None}
             logger.info(f"Marked {doc.get('id')} as new story")
 
-        # update chroma metadata for the article to include story_id
-        # if the doc isn't yet indexed in chroma, upsert it now
-        text = canonical_text(doc)
+    @staticmethod
+    def _story_metadata(doc: Dict[str, Any]) -> Dict[str, Any]:
         metadata = {
             "title": doc.get("title"),
             "source": doc.get("source"),
@@ -148,17 +217,213 @@ class Deduper:
             "url": doc.get("url"),
             "story_id": doc.get("story_id")
         }
+        ts = published_ts(doc)
+        if ts is not None:
+            metadata["published_ts"] = ts
+        return metadata
+
+    def assign_story_id_and_update(
+        self,
+        doc: Dict[str, Any],
+        embedding: Optional[np.ndarray] = None,
+        upsert: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Determine story_id for doc and update chroma metadata for that doc entry.
+        Returns updated doc (with 'story_id' set).
+
+        `embedding` is the precomputed embedding of canonical_text(doc); it is
+        computed here if omitted (unless the doc is a near-exact copy, which
+        reuses the original's embedding). With upsert=False the caller owns
+        the Chroma write (the pipeline's vector agent does a single write)
+        and the embedding is left in doc["_embedding"] for it.
+        """
+        text = canonical_text(doc)
+
+        # 1) cheap lexical check before touching the model
+        fp = self._fingerprint(text)
+        dup = self._near_exact(fp, doc.get("id"))
+        if dup and embedding is None:
+            embedding = self._stored_embedding(dup["duplicate_of"])
+
+        # 2) semantic check for everything else
+        if embedding is None:
+            embedding = self.embedder.embed_text(text)
+        if not dup:
+            dup = self.is_duplicate(doc, embedding)
+
+        self._mark_story(doc, dup)
+        if self.index is not None:
+            self.index.add([doc["id"]], [embedding])
+        if self.fingerprints is not None:
+            self.fingerprints.add(doc["id"], fp)
+
+        if not upsert:
+            doc["_embedding"] = embedding
+            return doc
+
+        # update chroma metadata for the article to include story_id
+        # if the doc isn't yet indexed in chroma, upsert it now
+        metadata = self._story_metadata(doc)
         try:
-            self.vs.collection.upsert(
-                ids=[str(doc["id"])],
-                documents=[text],
-                metadatas=[metadata],
-                embeddings=[self.embedder.embed_text(text)]
-            )
+            self.vs.upsert([doc["id"]], [text], [metadata], embedding)
         except Exception as e:
             logger.error(f"Failed to upsert doc {doc.get('id')} to vector store: {e}")
         return doc
 
+    def assign_story_ids_batch(
+        self,
+        docs: List[Dict[str, Any]],
+        embeddings: Optional[np.ndarray] = None,
+        upsert: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Batched equivalent of assign_story_id_and_update.
+        Resolves near-exact copies by fingerprint first, embeds the rest in
+        one model call (unless `embeddings` is given), scores them against
+        the index with one matrix-matrix product (or fetches Chroma
+        candidates with one multi-query + one get), and writes the batch
+        back with one upsert (with upsert=False embeddings are left in
+        doc["_embedding"] instead, as float32 rows).
+        Docs earlier in the batch count as candidates for later ones, so the
+        result matches processing the batch sequentially.
+        """
+        if not docs:
+            return docs
+        for doc in docs:
+            if "id" not in doc:
+                raise ValueError("Document missing 'id' field.")
+
+        texts = [canonical_text(d) for d in docs]
+
+        # 1) lexical near-exact prefilter (against history + earlier batch docs)
+        fps = [self._fingerprint(t) for t in texts]
+        near = []
+        for doc, fp in zip(docs, fps):
+            near.append(self._near_exact(fp, doc["id"]))
+            if self.fingerprints is not None:
+                self.fingerprints.add(doc["id"], fp)
+
+        # 2) embeddings: reuse originals for near-exact copies, one model call for the rest
+        if embeddings is None:
+            embeddings = self._batch_embeddings(docs, texts, near)
+        else:
+            embeddings = as_matrix(embeddings)
+
+        if self.index is not None:
+            matches = self._batch_matches_indexed(docs, embeddings)
+        else:
+            matches = self._batch_matches_chroma(docs, embeddings)
+
+        for doc, text, (best_id, best_sim), dup in zip(docs, texts, matches, near):
+            if dup is None and text:
+                logger.debug(f"Doc {doc.get('id')} best_sim={best_sim} best_id={best_id}")
+                if best_id is not None and best_sim >= self.threshold:
+                    dup = {"duplicate_of": best_id, "similarity": best_sim}
+            self._mark_story(doc, dup)
+
+        if self.index is not None:
+            self.index.add([d["id"] for d in docs], embeddings)
+
+        if not upsert:
+            for doc, emb in zip(docs, embeddings):
+                doc["_embedding"] = emb
+            return docs
+
+        # 4) one upsert for the whole batch
+        try:
+            self.vs.upsert(
+                [d["id"] for d in docs],
+                texts,
+                [self._story_metadata(d) for d in docs],
+                embeddings
+            )
+        except Exception as e:
+            logger.error(f"Failed to upsert batch of {len(docs)} docs to vector store: {e}")
+        return docs
+
+    def _batch_embeddings(self, docs, texts, near) -> np.ndarray:
+        """float32 [len(docs) x dim]: stored rows for near-exact copies, the model for the rest."""
+        batch_pos = {str(d["id"]): i for i, d in enumerate(docs)}
+        stored: Dict[int, np.ndarray] = {}
+        refs = {}
+        for i, dup in enumerate(near):
+            if not dup:
+                continue
+            j = batch_pos.get(dup["duplicate_of"])
+            if j is not None and j < i:
+                refs[i] = j  # original is earlier in this batch
+            else:
+                emb = self._stored_embedding(dup["duplicate_of"])
+                if emb is not None:
+                    stored[i] = emb
+
+        todo = [i for i in range(len(docs)) if i not in stored and i not in refs]
+        logger.debug(f"Batch of {len(docs)}: embedded {len(todo)}, reused {len(docs) - len(todo)}")
+        fresh = self.embedder.embed_batch([texts[i] for i in todo]) if todo else None
+        if len(todo) == len(docs):
+            return fresh  # nothing reused: the model's matrix as is
+
+        dim = fresh.shape[1] if fresh is not None else len(next(iter(stored.values())))
+        embeddings = np.empty((len(docs), dim), dtype=np.float32)
+        if todo:
+            embeddings[todo] = fresh
+        for i, emb in stored.items():
+            embeddings[i] = emb
+        for i in sorted(refs):
+            embeddings[i] = embeddings[refs[i]]
+        return embeddings
+
+    def _batch_matches_indexed(self, docs, embeddings) -> List[Tuple[Optional[str], float]]:
+        """
+        Best (id, sim) per doc: index hits via one matmul, plus earlier
+        docs of the same batch via one batch x batch matmul.
+        """
+        q = normalize_rows(embeddings)
+        idx_ids, idx_sims = self.index.search(q, normalized=True, exclude=[d["id"] for d in docs])
+
+        in_batch = q @ q.T
+        matches = []
+        for i in range(len(docs)):
+            best_id, best_sim = idx_ids[i], float(idx_sims[i])
+            if best_id is None or best_sim <= 0.0:
+                best_id, best_sim = None, 0.0
+            if i > 0:
+                j = int(in_batch[i, :i].argmax())
+                if in_batch[i, j] > best_sim:
+                    best_id, best_sim = str(docs[j]["id"]), float(in_batch[i, j])
+            matches.append((best_id, best_sim))
+        return matches
+
+    def _batch_matches_chroma(self, docs, embeddings) -> List[Tuple[Optional[str], float]]:
+        q = normalize_rows(embeddings)
+
+        # 1) candidate ids for every doc in a single query
+        try:
+            res = self.vs.query_embedding(q, top_k=self.top_k, include=["distances"])
+            candidate_lists = res.get("ids") or []
+        except Exception as e:
+            logger.error(f"Batch candidate query failed: {e}")
+            candidate_lists = []
+        candidate_lists = list(candidate_lists) + [[]] * (len(docs) - len(candidate_lists))
+
+        # 2) stored embeddings for the union of candidates in a single get
+        all_ids, cand_matrix = self._candidate_matrix(sorted({cid for ids in candidate_lists for cid in ids}))
+        row = {cid: r for r, cid in enumerate(all_ids)}
+
+        # 3) score against stored candidates + earlier docs of this batch
+        batch_ids = [str(d["id"]) for d in docs]
+        matches = []
+        for i, cand_ids in enumerate(candidate_lists):
+            cand_ids = [cid for cid in cand_ids if cid in row and cid != batch_ids[i]]
+            best_id, best_sim = best_match(q[i], cand_ids, cand_matrix[[row[c] for c in cand_ids]])
+            if i > 0:
+                j, sim = best_match(q[i], list(range(i)), q[:i])
+                if j is not None and sim > best_sim:
+                    best_id, best_sim = batch_ids[j], sim
+            matches.append((best_id, best_sim))
+        return matches
+
     def process_documents(self, docs: List[Dict[str, Any]], persist: bool = True) -> List[Dict[str, Any]]:
         """
         Process a list of docs sequentially and assign story_ids.
@@ -0,0 +1,109 @@
+# src/dedupe/fingerprint.py
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+FP_BITS = 64
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def simhash(text: str, shingle_size: int = 3) -> Optional[int]:
+    """
+    64-bit SimHash over word shingles of `text` (lower-cased).
+    Near-identical texts get fingerprints a few bits apart.
+    Returns None for text without any word tokens.
+    """
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    if not tokens:
+        return None
+    if len(tokens) <= shingle_size:
+        shingles = [" ".join(tokens)]
+    else:
+        shingles = [" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+
+    digests = b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    return int.from_bytes(np.packbits(votes > 0).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class SimHashIndex:
+    """
+    Hamming-distance index over SimHash fingerprints.
+
+    The 64 bits are split into (max_distance + 1) bands; two fingerprints
+    within max_distance bits must agree exactly on at least one band
+    (pigeonhole), so only ids sharing a band value are compared.
+    Keeps the most recent `capacity` fingerprints.
+    """
+
+    def __init__(self, max_distance: int = 3, capacity: int = 50000):
+        self.max_distance = max_distance
+        self.capacity = capacity
+        bands = max_distance + 1
+        edges = [round(i * FP_BITS / bands) for i in range(bands + 1)]
+        self._bands = [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(edges, edges[1:])]
+        self._tables = [dict() for _ in self._bands]
+        self._fps: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()  # id -> (fp, seq)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._fps)
+
+    def _band_keys(self, fp: int):
+        return [(fp >> lo) & mask for lo, mask in self._bands]
+
+    def add(self, doc_id, fp: Optional[int]):
+        if fp is None:
+            return
+        doc_id = str(doc_id)
+        with self._lock:
+            if doc_id in self._fps:
+                self._remove(doc_id)
+            self._seq += 1
+            self._fps[doc_id] = (fp, self._seq)
+            for table, key in zip(self._tables, self._band_keys(fp)):
+                table.setdefault(key, set()).add(doc_id)
+            while len(self._fps) > self.capacity:
+                self._remove(next(iter(self._fps)))
+
+    def _remove(self, doc_id: str):
+        fp, _ = self._fps.pop(doc_id)
+        for table, key in zip(self._tables, self._band_keys(fp)):
+            ids = table.get(key)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del table[key]
+
+    def find(self, fp: Optional[int], exclude=None) -> Tuple[Optional[str], Optional[int]]:
+        """
+        Closest stored id within max_distance bits, as (id, distance);
+        ties go to the earliest-added id. (None, None) when there is none.
+        `exclude` (an id) is never returned.
+        """
+        exclude = None if exclude is None else str(exclude)
+        if fp is None:
+            return None, None
+        best_id, best_dist, best_seq = None, None, None
+        with self._lock:
+            seen = set()
+            for table, key in zip(self._tables, self._band_keys(fp)):
+                for cid in table.get(key, ()):
+                    if cid in seen or cid == exclude:
+                        continue
+                    seen.add(cid)
+                    cfp, seq = self._fps[cid]
+                    d = hamming(fp, cfp)
+                    if d <= self.max_distance and (best_dist is None or (d, seq) < (best_dist, best_seq)):
+                        best_id, best_dist, best_seq = cid, d, seq
+        return best_id, best_dist
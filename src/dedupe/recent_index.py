@@ -0,0 +1,80 @@
+# src/dedupe/recent_index.py
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.logger import get_logger
+from src.vector.vector_store import normalize_rows
+
+logger = get_logger("RecentIndex")
+
+
+class RecentEmbeddingIndex:
+    """
+    Hot in-memory dedupe index over the most recent `capacity` articles.
+
+    Rows are L2-normalised float32, so cosine similarity is a plain dot
+    product: one matrix-vector product per article, one matrix-matrix
+    product per batch. Oldest rows are overwritten (ring buffer) once full.
+    Chroma remains the durable store; Deduper re-warms this from it on start.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._matrix: Optional[np.ndarray] = None
+        self._ids: List[Optional[str]] = [None] * capacity
+        self._rows = {}
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def add(self, ids: Iterable, embeddings):
+        vecs = normalize_rows(embeddings)
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.capacity, vecs.shape[1]), dtype=np.float32)
+            for doc_id, vec in zip(ids, vecs):
+                doc_id = str(doc_id)
+                row = self._rows.get(doc_id)
+                if row is None:
+                    row = self._next
+                    evicted = self._ids[row]
+                    if evicted is not None:
+                        del self._rows[evicted]
+                    self._ids[row] = doc_id
+                    self._rows[doc_id] = row
+                    self._next = (row + 1) % self.capacity
+                    self._size = min(self._size + 1, self.capacity)
+                self._matrix[row] = vec
+
+    def get(self, doc_id) -> Optional[np.ndarray]:
+        """Stored (normalised) embedding for doc_id, or None if not in the window."""
+        with self._lock:
+            row = self._rows.get(str(doc_id))
+            return None if row is None else self._matrix[row].copy()
+
+    def search(self, embeddings, normalized: bool = False, exclude=None) -> Tuple[List[Optional[str]], np.ndarray]:
+        """
+        Best match in the index for each query embedding.
+        Returns (best_ids, best_sims); ids are None (sim 0) when there is no
+        candidate. Pass normalized=True when `embeddings` already is
+        normalize_rows output; `exclude` lists one id per query row that
+        must not match it (the article's own earlier row).
+        """
+        q = embeddings if normalized else normalize_rows(embeddings)
+        with self._lock:
+            if self._size == 0:
+                return [None] * len(q), np.zeros(len(q), dtype=np.float32)
+            sims = q @ self._matrix[:self._size].T
+            for i, doc_id in enumerate(exclude or ()):
+                row = self._rows.get(str(doc_id)) if doc_id is not None else None
+                if row is not None:
+                    sims[i, row] = -np.inf
+            best = sims.argmax(axis=1)
+            best_sims = sims[np.arange(len(q)), best]
+            best_ids = [self._ids[b] if np.isfinite(s) else None for b, s in zip(best, best_sims)]
+        return best_ids, np.where(np.isfinite(best_sims), best_sims, 0.0).astype(np.float32)
@@ -1,29 +1,36 @@
 # src/dedupe/run_dedupe.py
-import json
 from pathlib import Path
 from src.dedupe.deduper import Deduper
+from src.utils import chunked
+from src.utils.json_stream import iter_articles, ArticleWriter
 from src.utils.logger import get_logger
+from src.config.config import Config
 
 logger = get_logger("run_dedupe")
 
-def run(input_path: str = "data/news_final.json", output_path: str = "data/news_final_with_story.json"):
+def run(
+    input_path: str = "data/news_final.json",
+    output_path: str = "data/news_final_with_story.json",
+    batch_size: int | None = None
+):
     input_p = Path(input_path)
     output_p = Path(output_path)
+    batch_size = batch_size or Config.INGEST_BATCH_SIZE
 
     if not input_p.exists():
         raise FileNotFoundError(f"Input dataset not found at {input_p.resolve()}")
 
-    with open(input_p, "r", encoding="utf-8") as f:
-        docs = json.load(f)
-
     deduper = Deduper(top_k=5)
-    updated_docs = deduper.process_documents(docs, persist=True)
 
-    # write output
-    with open(output_p, "w", encoding="utf-8") as f:
-        json.dump(updated_docs, f, indent=2, ensure_ascii=False)
+    # stream input → dedupe → output, one batch in memory at a time
+    with ArticleWriter(output_p) as writer:
+        for batch in chunked(iter_articles(input_p), batch_size):
+            for doc in deduper.process_documents(batch, persist=False):
+                writer.write(doc)
 
-    logger.info(f"Wrote deduplicated dataset to {output_p.resolve()}")
+    logger.info(f"Wrote {writer.count} deduplicated articles to {output_p.resolve()}")
+    if hasattr(deduper.embedder, "stats"):
+        logger.info(f"Embedding cache: {deduper.embedder.stats()}")
 
 if __name__ == "__main__":
     run()
@@ -0,0 +1,120 @@
+# src/impact/company_matcher.py
+
+import csv
+import re
+import threading
+from pathlib import Path
+from src.config.config import Config
+from src.utils.logger import get_logger
+
+logger = get_logger("CompanyMatcher")
+
+
+def compile_terms(terms):
+    """
+    One case-insensitive, word-bounded alternation for all `terms`
+    (longest first, so "HDFC Bank" wins over "HDFC" at the same position).
+    Returns None when there is nothing to match.
+    """
+    uniq = sorted({t.strip() for t in terms if t and t.strip()}, key=len, reverse=True)
+    if not uniq:
+        return None
+    return re.compile(r"\b(?:" + "|".join(re.escape(t) for t in uniq) + r")\b", re.IGNORECASE)
+
+
+def load_company_rows(path) -> list[dict]:
+    """
+    Rows of company_to_ticker.csv in file order:
+    {"company", "ticker", "sector", "aliases": [...]}. [] when the file is missing.
+    """
+    path = Path(path)
+    if not path.exists():
+        logger.warning(f"Mapping CSV not found: {path}")
+        return []
+    with open(path, newline="", encoding="utf-8") as f:
+        return [
+            {
+                "company": r["company_name"],
+                "ticker": r["ticker"],
+                "sector": r.get("sector", ""),
+                "aliases": [a.strip() for a in (r.get("aliases") or "").split(",") if a.strip()],
+            }
+            for r in csv.DictReader(f)
+        ]
+
+
+class CompanyMatcher:
+    """
+    Precompiled matcher over every company name, alias and ticker in
+    company_to_ticker.csv. A single regex pass finds every mentioned
+    company in a text; lookup() resolves one surface form to its row.
+
+    Names and tickers take precedence over aliases; within each, the first
+    row in CSV order wins.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self._exact = {}
+        self._alias = {}
+        for row in rows:
+            for term in (row["company"], row["ticker"]):
+                key = term.strip().lower()
+                if key:
+                    self._exact.setdefault(key, row)
+            for alias in row["aliases"]:
+                self._alias.setdefault(alias.strip().lower(), row)
+        self._pattern = compile_terms([*self._exact, *self._alias])
+
+    @classmethod
+    def from_csv(cls, path):
+        rows = load_company_rows(path)
+        logger.info(f"Built company matcher: {len(rows)} companies from {path}")
+        return cls(rows)
+
+    def lookup(self, term: str, aliases: bool = True):
+        """
+        Row for an exact (case-insensitive) name / ticker, or alias when
+        `aliases` is on; else None.
+        """
+        key = (term or "").strip().lower()
+        row = self._exact.get(key)
+        if row is None and aliases:
+            row = self._alias.get(key)
+        return row
+
+    def find(self, text: str):
+        """Rows of every company mentioned in text (one pass, word boundaries)."""
+        if not text or self._pattern is None:
+            return []
+        found = {}
+        for m in self._pattern.finditer(text):
+            row = self.lookup(m.group(0))
+            found.setdefault(row["ticker"], row)
+        return list(found.values())
+
+    def find_tickers(self, text: str) -> set:
+        return {row["ticker"] for row in self.find(text)}
+
+
+_MATCHERS = {}
+_MATCHERS_LOCK = threading.Lock()
+
+
+def get_company_matcher(mapping_csv: str = None) -> CompanyMatcher:
+    """
+    Shared matcher for the mapping CSV; rebuilt only when the file changes.
+    """
+    path = Path(mapping_csv or Config.COMPANY_MAPPING_CSV)
+    try:
+        version = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        version = None
+
+    with _MATCHERS_LOCK:
+        cached = _MATCHERS.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        matcher = CompanyMatcher.from_csv(path)
+        _MATCHERS[path] = (version, matcher)
+        return matcher
@@ -1,93 +1,100 @@
 # src/impact/impact_mapper.py
 
-import csv
 from pathlib import Path
 from src.utils.logger import get_logger
+from src.config.config import Config
+from src.impact.company_matcher import get_company_matcher
 
 logger = get_logger("ImpactMapper")
 
-DEFAULT_MAPPING_PATH = Path("data/company_to_ticker.csv")
+DEFAULT_MAPPING_PATH = Path(Config.COMPANY_MAPPING_CSV)
+
+# Regulators → small universal impact (when not already a mapped company)
+REGULATORS = ("rbi", "sebi", "fed", "ecb")
 
 
 class ImpactMapper:
     """
     Maps detected NER entities to tickers using a clean CSV mapping.
     No fuzzy match. Strict and reliable.
+
+    Company lookups go through the shared CompanyMatcher for the CSV
+    (name or ticker, plus the `aliases` column when match_aliases is on);
+    regulators resolve from their own small table.
     """
 
-    def __init__(self, mapping_csv: str = None):
+    def __init__(self, mapping_csv: str = None, match_aliases: bool = None):
         self.mapping_path = Path(mapping_csv) if mapping_csv else DEFAULT_MAPPING_PATH
-        self.table = []
-        self._load_mapping()
-
-    def _load_mapping(self):
-        if not self.mapping_path.exists():
-            logger.warning(f"Mapping CSV not found: {self.mapping_path}")
-            return
-
-        with open(self.mapping_path, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for r in reader:
-                self.table.append({
-                    "company": r["company_name"],
-                    "ticker": r["ticker"],
-                    "sector": r.get("sector", "")
-                })
-
+        self.match_aliases = Config.IMPACT_MATCH_ALIASES if match_aliases is None else match_aliases
+        self.matcher = get_company_matcher(self.mapping_path)
+        self.table = self.matcher.rows
+        self._regulators = {
+            name: {"ticker": name.upper(), "company": name.upper(), "confidence": 1.0, "type": "regulator"}
+            for name in REGULATORS
+        }
         logger.info(f"Loaded {len(self.table)} mappings from CSV.")
 
     # ----------------------------------------------------------
     # STRICT Matching (no fuzzy logic)
     # ----------------------------------------------------------
     def strict_match(self, entity_text: str):
-        text = entity_text.lower().strip()
-
-        # direct match: company name or ticker exact
-        for row in self.table:
-            if text == row["company"].lower():
-                return row
-            if text == row["ticker"].lower():
-                return row
-
-        return None
+        # direct match: company name or ticker exact (aliases if enabled)
+        return self.matcher.lookup(entity_text, aliases=self.match_aliases)
+
+    def _resolve(self, text: str):
+        """
+        Impact for one entity surface form, or None.
+        """
+        match = self.strict_match(text)
+        if match:
+            return {
+                "ticker": match["ticker"],
+                "company": match["company"],
+                "confidence": 1.0,
+                "type": "direct"
+            }
+        return self._regulators.get(text.lower())
+
+    @staticmethod
+    def _unique_by_ticker(impacts):
+        # Deduplicate by ticker
+        unique = {}
+        for imp in impacts:
+            t = imp["ticker"]
+            if t not in unique:
+                unique[t] = dict(imp)
+        return list(unique.values())
 
     # ----------------------------------------------------------
     # Compute impacts
     # ----------------------------------------------------------
     def compute_impacts(self, doc):
         impacts = []
-        ents = doc.get("entities", [])
-
-        for e in ents:
-            text = e.get("text", "").strip()
-            label = e.get("label", "").upper()
-
-            # Direct company or ticker match
-            match = self.strict_match(text)
-            if match:
-                impacts.append({
-                    "ticker": match["ticker"],
-                    "company": match["company"],
-                    "confidence": 1.0,
-                    "type": "direct"
-                })
-                continue
+        for e in doc.get("entities", []):
+            imp = self._resolve(e.get("text", "").strip())
+            if imp:
+                impacts.append(imp)
 
-            # Regulator → small universal impact
-            if text.lower() in ("rbi", "sebi", "fed", "ecb"):
-                impacts.append({
-                    "ticker": text.upper(),
-                    "company": text.upper(),
-                    "confidence": 1.0,
-                    "type": "regulator"
-                })
-
-        # Deduplicate by ticker
-        unique = {}
-        for imp in impacts:
-            t = imp["ticker"]
-            if t not in unique:
-                unique[t] = imp
-
-        doc["impacts"] = list(unique.values())
+        doc["impacts"] = self._unique_by_ticker(impacts)
         return doc
+
+    def compute_impacts_batch(self, docs):
+        """
+        compute_impacts over a batch, resolving each distinct entity
+        string once for the whole batch.
+        """
+        resolved = {}
+        for doc in docs:
+            for e in doc.get("entities", []):
+                text = e.get("text", "").strip()
+                if text not in resolved:
+                    resolved[text] = self._resolve(text)
+
+        for doc in docs:
+            impacts = []
+            for e in doc.get("entities", []):
+                imp = resolved[e.get("text", "").strip()]
+                if imp:
+                    impacts.append(imp)
+            doc["impacts"] = self._unique_by_ticker(impacts)
+        return docs
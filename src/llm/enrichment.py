@@ -0,0 +1,89 @@
+# src/llm/enrichment.py
+
+import queue
+import threading
+
+from src.config.config import Config
+from src.utils.logger import get_logger
+
+logger = get_logger("Enricher")
+
+
+class Enricher:
+    """
+    Background LLM enrichment for freshly stored articles.
+
+    submit() never blocks the ingest pipeline: items go onto a bounded
+    queue (dropped with a warning when it is full) and worker threads
+    precompute the summary plus one explanation per impacted company into
+    the SummaryStore, so queries can serve them without a live LLM call.
+    """
+
+    def __init__(self, maxsize: int = None, num_workers: int = None, store=None):
+        self.maxsize = maxsize or Config.LLM_ENRICH_QUEUE_MAXSIZE
+        self.num_workers = num_workers or Config.LLM_ENRICH_WORKERS
+        self._store = store
+        self._queue = queue.Queue(maxsize=self.maxsize)
+        self._lock = threading.Lock()
+        self._workers = []
+        self.enriched = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def _get_store(self):
+        if self._store is None:
+            from src.llm.summary_store import SummaryStore  # local import
+            self._store = SummaryStore()
+        return self._store
+
+    def submit(self, items):
+        """
+        items: iterable of {"id", "title", "body", "companies"} dicts,
+        where body is exactly the text the query side will summarise.
+        """
+        with self._lock:
+            for item in items:
+                try:
+                    self._queue.put_nowait(item)
+                except queue.Full:
+                    self.dropped += 1
+                    logger.warning(f"Enrichment queue full; skipped article ID={item.get('id')}")
+            self._ensure_workers()
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "enriched": self.enriched,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    def _ensure_workers(self):
+        self._workers = [w for w in self._workers if w.is_alive()]
+        while len(self._workers) < self.num_workers:
+            w = threading.Thread(
+                target=self._worker_loop,
+                name=f"enrich-worker-{len(self._workers)}",
+                daemon=True
+            )
+            w.start()
+            self._workers.append(w)
+
+    def _worker_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                self.enrich(item)
+                self.enriched += 1
+            except Exception as ex:
+                self.failed += 1
+                logger.error(f"Enrichment failed for article ID={item.get('id')}: {ex}")
+            finally:
+                self._queue.task_done()
+
+    def enrich(self, item: dict):
+        store = self._get_store()
+        art_id, title, body = item["id"], item.get("title") or "", item.get("body") or ""
+        store.summary(art_id, title, body)
+        for company in item.get("companies", []):
+            store.explanation(art_id, title, body, company)
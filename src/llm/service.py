@@ -1,16 +1,43 @@
+import json
 import requests
+from requests.adapters import HTTPAdapter
+from src.config.config import Config
 
 # Ollama local server endpoint
-OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_URL = Config.OLLAMA_URL
 MODEL = "llama3.2:latest"   # Your installed model
 
+# Bump whenever the prompts below change: stored outputs are keyed on it
+PROMPT_VERSION = "v1"
+LLM_ERROR_PREFIX = "[LLM Error"
+# Returned in place of an answer that missed the per-query deadline
+LLM_TIMEOUT_PLACEHOLDER = "[LLM timeout: not ready within the query time budget]"
+# Default HTTP timeout (seconds): allows for the model's first load
+LLM_TIMEOUT = 240
 
-def call_ollama(prompt: str, max_tokens=200) -> str:
+
+def _build_session() -> requests.Session:
+    # keep-alive connections, pool sized for the concurrent query-time calls
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=max(1, Config.LLM_MAX_CONCURRENCY)
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_session = _build_session()
+
+
+def call_ollama(prompt: str, max_tokens=200, timeout: float = None) -> str:
     """
-    Calls local Ollama safely with extended timeout.
+    Calls local Ollama safely. timeout (seconds) defaults to LLM_TIMEOUT;
+    query-time callers pass what is left of their budget.
     """
     try:
-        response = requests.post(
+        response = _session.post(
             OLLAMA_URL,
             json={
                 "model": MODEL,
@@ -18,21 +45,54 @@ def call_ollama(prompt: str, max_tokens=200) -> str:
                 "stream": False,
                 "max_tokens": max_tokens
             },
-            timeout=240   # 4 minutes initial load allowed
+            timeout=timeout or LLM_TIMEOUT
         )
         response.raise_for_status()
         return response.json().get("response", "").strip()
 
     except Exception as e:
-        return f"[LLM Error: {e}]"
+        return f"{LLM_ERROR_PREFIX}: {e}]"
+
+
+def stream_ollama(prompt: str, max_tokens=200, timeout: float = None):
+    """
+    Streaming variant of call_ollama ("stream": true): yields response
+    text chunks as Ollama produces them. Errors are yielded as one
+    "[LLM Error: ...]" chunk, like call_ollama returns them. timeout is
+    the longest wait for the next chunk (default LLM_TIMEOUT).
+    """
+    try:
+        with _session.post(
+            OLLAMA_URL,
+            json={
+                "model": MODEL,
+                "prompt": prompt,
+                "stream": True,
+                "max_tokens": max_tokens
+            },
+            stream=True,
+            timeout=timeout or LLM_TIMEOUT
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                part = json.loads(line)
+                if part.get("response"):
+                    yield part["response"]
+                if part.get("done"):
+                    break
+
+    except Exception as e:
+        yield f"{LLM_ERROR_PREFIX}: {e}]"
 
 
 
 # -------------------------------------------------------------
 #  ARTICLE SUMMARY (NO HALLUCINATIONS)
 # -------------------------------------------------------------
-def summarize_article(title: str, body: str) -> str:
-    prompt = f"""
+def summary_prompt(title: str, body: str) -> str:
+    return f"""
 Summarize this article in exactly 2 short bullet points.
 Use only the information present. 
 No guessing.
@@ -42,14 +102,21 @@ Article:
 
 SUMMARY:
 """
-    return call_ollama(prompt, max_tokens=120)
+
+
+def summarize_article(title: str, body: str, timeout: float = None) -> str:
+    return call_ollama(summary_prompt(title, body), max_tokens=120, timeout=timeout)
+
+
+def summarize_article_stream(title: str, body: str, timeout: float = None):
+    return stream_ollama(summary_prompt(title, body), max_tokens=120, timeout=timeout)
 
 
 # -------------------------------------------------------------
 #  IMPACT EXPLANATION (STRICT, NO GUESSING)
 # -------------------------------------------------------------
-def explain_impact(title: str, body: str, company: str) -> str:
-    prompt = f"""
+def explain_prompt(title: str, body: str, company: str) -> str:
+    return f"""
 You are a financial analyst.
 Explain in 2 sentences how this article impacts **{company}**.
 
@@ -66,4 +133,11 @@ ARTICLE:
 
 EXPLANATION:
 """
-    return call_ollama(prompt, max_tokens=120)
+
+
+def explain_impact(title: str, body: str, company: str, timeout: float = None) -> str:
+    return call_ollama(explain_prompt(title, body, company), max_tokens=120, timeout=timeout)
+
+
+def explain_impact_stream(title: str, body: str, company: str, timeout: float = None):
+    return stream_ollama(explain_prompt(title, body, company), max_tokens=120, timeout=timeout)
@@ -0,0 +1,105 @@
+# src/llm/stub_ollama.py
+"""
+Minimal stand-in for Ollama's /api/generate, for exercising the LLM code
+paths (streaming endpoint, enrichment, benchmarks) without a model.
+
+    python -m src.llm.stub_ollama --port 11435 --delay 0.02
+    OLLAMA_URL=http://127.0.0.1:11435/api/generate uvicorn src.api.main:app
+
+Replies are deterministic: a fixed sentence split into word tokens,
+streamed as NDJSON when the request sets "stream": true.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_REPLY = "Stub answer: the article reports a development for the company mentioned."
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    delay = 0.0  # seconds per token
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self.send_error(400, "invalid JSON")
+            return
+
+        tokens = [w + " " for w in STUB_REPLY.split()]
+        model = payload.get("model", "stub")
+
+        try:
+            if not payload.get("stream", True):
+                time.sleep(self.delay * len(tokens))
+                self._send_json({"model": model, "response": "".join(tokens).strip(), "done": True})
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for tok in tokens:
+                time.sleep(self.delay)
+                self._write_chunk({"model": model, "response": tok, "done": False})
+            self._write_chunk({"model": model, "response": "", "done": True})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # the client stopped reading (e.g. its query budget ran out)
+            self.close_connection = True
+
+    def _send_json(self, obj):
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, obj):
+        data = (json.dumps(obj) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, delay: float = 0.0):
+    """
+    Start the stub in a daemon thread; returns (server, generate_url).
+    port=0 picks a free port. Call server.shutdown() to stop it.
+    """
+    handler = type("Handler", (StubOllamaHandler,), {"delay": delay})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stub-ollama", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/api/generate"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Ollama /api/generate server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds per streamed token")
+    args = parser.parse_args()
+
+    handler = type("Handler", (StubOllamaHandler,), {"delay": args.delay})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Stub Ollama listening on http://{args.host}:{args.port}/api/generate")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
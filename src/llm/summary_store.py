@@ -0,0 +1,138 @@
+# src/llm/summary_store.py
+
+import hashlib
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from src.db.db import Base, SessionLocal, engine
+from src.db.models import LLMOutput
+from src.llm import service
+from src.utils.logger import get_logger
+
+logger = get_logger("SummaryStore")
+
+SUMMARY = "summary"
+EXPLANATION = "explanation"
+
+
+def content_hash(title: str, body: str) -> str:
+    h = hashlib.sha256()
+    h.update((title or "").encode("utf-8"))
+    h.update(b"\x00")
+    h.update((body or "").encode("utf-8"))
+    return h.hexdigest()
+
+
+def _subject(company: str) -> str:
+    return (company or "").strip().lower()
+
+
+class SummaryStore:
+    """
+    Persistent store of LLM summaries and impact explanations.
+
+    Rows are keyed on (article id, content hash, prompt version, model),
+    plus the company for explanations, so an edited article, a new prompt
+    or a different model never serves a stale answer. summary() and
+    explanation() read the store first and only call the LLM on a miss.
+    """
+
+    def __init__(self, model: str = None, prompt_version: str = None):
+        self.model = model or service.MODEL
+        self.prompt_version = prompt_version or service.PROMPT_VERSION
+        self.hits = 0
+        self.misses = 0
+        # the table is new; create it on databases initialised before it existed
+        Base.metadata.create_all(bind=engine, tables=[LLMOutput.__table__])
+
+    # -----------------------------------
+    # Raw get / put
+    # -----------------------------------
+    def _key(self, article_id, kind, company, title, body):
+        return {
+            "article_id": str(article_id),
+            "kind": kind,
+            "subject": _subject(company),
+            "content_hash": content_hash(title, body),
+            "prompt_version": self.prompt_version,
+            "model": self.model,
+        }
+
+    def get(self, article_id, kind: str, title: str, body: str, company: str = None):
+        key = self._key(article_id, kind, company, title, body)
+        stmt = select(LLMOutput.text).filter_by(**key).limit(1)
+        with SessionLocal() as db:
+            text = db.execute(stmt).scalar_one_or_none()
+        if text is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return text
+
+    def put(self, article_id, kind: str, title: str, body: str, text: str, company: str = None):
+        """Persist one output; LLM error strings are never stored."""
+        if not text or text.startswith(service.LLM_ERROR_PREFIX):
+            return False
+        row = LLMOutput(text=text, **self._key(article_id, kind, company, title, body))
+        with SessionLocal() as db:
+            try:
+                db.add(row)
+                db.commit()
+            except IntegrityError:
+                # another worker stored the same key first
+                db.rollback()
+        return True
+
+    # -----------------------------------
+    # Read-through helpers
+    # -----------------------------------
+    def summary(self, article_id, title: str, body: str, live: bool = True, timeout: float = None):
+        text = self.get(article_id, SUMMARY, title, body)
+        if text is None and live:
+            text = service.summarize_article(title, body, timeout=timeout)
+            self.put(article_id, SUMMARY, title, body, text)
+        return text
+
+    def explanation(self, article_id, title: str, body: str, company: str, live: bool = True, timeout: float = None):
+        text = self.get(article_id, EXPLANATION, title, body, company=company)
+        if text is None and live:
+            text = service.explain_impact(title, body, company, timeout=timeout)
+            self.put(article_id, EXPLANATION, title, body, text, company=company)
+        return text
+
+    # -----------------------------------
+    # Streaming read-through (for /query/stream)
+    # -----------------------------------
+    def _stream(self, article_id, kind, title, body, company, live_stream):
+        text = self.get(article_id, kind, title, body, company=company)
+        if text is not None:
+            yield text
+            return
+        parts = []
+        for chunk in live_stream():
+            parts.append(chunk)
+            yield chunk
+        self.put(article_id, kind, title, body, "".join(parts).strip(), company=company)
+
+    def stream_summary(self, article_id, title: str, body: str, timeout: float = None):
+        return self._stream(
+            article_id, SUMMARY, title, body, None,
+            lambda: service.summarize_article_stream(title, body, timeout=timeout)
+        )
+
+    def stream_explanation(self, article_id, title: str, body: str, company: str, timeout: float = None):
+        return self._stream(
+            article_id, EXPLANATION, title, body, company,
+            lambda: service.explain_impact_stream(title, body, company, timeout=timeout)
+        )
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            "model": self.model,
+            "prompt_version": self.prompt_version,
+        }
@@ -1,11 +1,23 @@
 # src/ner/custom_ner.py
 
 import re
-import spacy
+import threading
+from collections import OrderedDict
+
+import numpy as np
 from rapidfuzz import fuzz, process
+from src.config.config import Config
+from src.ner.spacy_model import get_nlp
+
+SPACY_MODEL = "en_core_web_sm"
+
 
-# Load spaCy model once
-nlp = spacy.load("en_core_web_sm")
+def __getattr__(name):
+    # `custom_ner.nlp` still works, but the model loads on first use
+    # (shared process-wide) instead of at import time
+    if name == "nlp":
+        return get_nlp(SPACY_MODEL)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # -----------------------------
 # 1) Base Company List (expand later)
@@ -36,21 +48,102 @@ def clean_headline_text(text: str) -> str:
 # -----------------------------
 # 3) Fuzzy company name matching
 # -----------------------------
+# spaCy labels that never name a company; skipped before fuzzy scoring
+NON_COMPANY_LABELS = {"DATE", "TIME", "CARDINAL", "ORDINAL", "MONEY", "PERCENT", "QUANTITY"}
+FUZZY_MIN_SCORE = 80
+
+_fuzzy_memo = OrderedDict()
+_fuzzy_lock = threading.Lock()
+
+
+def could_be_company(text: str, label: str = None) -> bool:
+    """
+    Cheap label/shape prefilter: numeric-only spans and spaCy's
+    numeric/temporal labels are never worth a fuzzy search.
+    """
+    if label in NON_COMPANY_LABELS:
+        return False
+    return any(ch.isalpha() for ch in text or "")
+
+
+def _memo_get(text: str):
+    with _fuzzy_lock:
+        if text in _fuzzy_memo:
+            _fuzzy_memo.move_to_end(text)
+            return True, _fuzzy_memo[text]
+    return False, None
+
+
+def _memo_put(text: str, match):
+    with _fuzzy_lock:
+        _fuzzy_memo[text] = match
+        _fuzzy_memo.move_to_end(text)
+        while len(_fuzzy_memo) > Config.NER_FUZZY_CACHE_SIZE:
+            _fuzzy_memo.popitem(last=False)
+
+
 def match_company_name(text: str):
     """
     Fuzzy match extracted entity against known companies.
     Returns best match if score >= 80 else None.
+    Results are memoised per surface form (bounded LRU).
     """
     if not text:
         return None
 
+    hit, cached = _memo_get(text)
+    if hit:
+        return cached
+
     match, score, _ = process.extractOne(
         text,
         COMPANY_LIST,
         scorer=fuzz.WRatio
     )
 
-    return match if score >= 80 else None
+    result = match if score >= FUZZY_MIN_SCORE else None
+    _memo_put(text, result)
+    return result
+
+
+def match_company_names(texts) -> dict:
+    """
+    Resolve many surface forms at once: {text: best match or None}.
+    Memo misses are scored in a single process.cdist call when there are
+    at least NER_FUZZY_CDIST_MIN of them; first best wins on ties, as with
+    extractOne.
+    """
+    resolved = {}
+    pending = []
+    for text in dict.fromkeys(texts):
+        if not text:
+            resolved[text] = None
+            continue
+        hit, cached = _memo_get(text)
+        if hit:
+            resolved[text] = cached
+        else:
+            pending.append(text)
+
+    if len(pending) < Config.NER_FUZZY_CDIST_MIN:
+        for text in pending:
+            resolved[text] = match_company_name(text)
+        return resolved
+
+    scores = process.cdist(pending, COMPANY_LIST, scorer=fuzz.WRatio, dtype=np.float64)
+    best = scores.argmax(axis=1)
+    for text, row, b in zip(pending, scores, best):
+        result = COMPANY_LIST[b] if row[b] >= FUZZY_MIN_SCORE else None
+        _memo_put(text, result)
+        resolved[text] = result
+    return resolved
+
+
+def _company_candidates(doc):
+    return [
+        ent.text.strip() for ent in doc.ents
+        if could_be_company(ent.text.strip(), ent.label_)
+    ]
 
 # -----------------------------
 # 4) FINAL NER LOGIC (updated)
@@ -67,8 +160,39 @@ def final_ner_logic_v4(text: str):
     """
 
     full_text = clean_headline_text(text)
-    doc = nlp(full_text)
+    doc = get_nlp(SPACY_MODEL)(full_text)
+    return _postprocess_entities(full_text, doc, match_company_names(_company_candidates(doc)))
 
+
+def final_ner_logic_v4_batch(texts, batch_size: int = None, n_process: int = None):
+    """
+    Batch version of final_ner_logic_v4.
+    Streams the cleaned texts through nlp.pipe and applies exactly the
+    same post-processing per text. Returns one entity list per input text.
+    """
+    batch_size = batch_size or Config.NER_BATCH_SIZE
+    n_process = n_process or Config.NER_N_PROCESS
+
+    cleaned = [clean_headline_text(t or "") for t in texts]
+    docs = list(get_nlp(SPACY_MODEL).pipe(cleaned, batch_size=batch_size, n_process=n_process))
+
+    # resolve every candidate span of the batch in one fuzzy pass
+    companies = match_company_names(
+        text for doc in docs for text in _company_candidates(doc)
+    )
+    return [
+        _postprocess_entities(full_text, doc, companies)
+        for full_text, doc in zip(cleaned, docs)
+    ]
+
+
+def _postprocess_entities(full_text: str, doc, companies: dict = None):
+    """
+    Regex money + fuzzy company correction + dedup over one parsed doc.
+    `companies` holds pre-resolved fuzzy matches (see match_company_names);
+    spans missing from it are resolved one at a time.
+    """
+    companies = companies or {}
     cleaned_entities = []
 
     # -----------------------------
@@ -92,7 +216,12 @@ def final_ner_logic_v4(text: str):
         ent_label = ent.label_
 
         # 2A — Try fuzzy match to known company names
-        best_match = match_company_name(ent_text)
+        best_match = None
+        if could_be_company(ent_text, ent_label):
+            if ent_text in companies:
+                best_match = companies[ent_text]
+            else:
+                best_match = match_company_name(ent_text)
         if best_match:
             cleaned_entities.append({
                 "entity": best_match,
@@ -2,52 +2,44 @@
 import logging
 from src.utils import canonical_text
 from src.utils.logger import get_logger
+from src.config.config import Config
 
 logger = get_logger("NERAgent")
 
 # Try to import user's custom NER. If not available, fallback to spaCy.
 try:
-    from src.ner.custom_ner import final_ner_logic_v4
+    from src.ner.custom_ner import final_ner_logic_v4, final_ner_logic_v4_batch
     HAS_CUSTOM_NER = True
     logger.info("Using custom final_ner_logic_v4 NER backend.")
 except Exception as ex:
     HAS_CUSTOM_NER = False
     logger.warning(f"Custom NER not found; falling back to spaCy. Reason: {ex}")
 
-if not HAS_CUSTOM_NER:
-    import spacy
-    # use the small English model (already installed via requirements)
-    nlp = spacy.load("en_core_web_sm")
+# spaCy fallback pipeline: the small English model (already installed via
+# requirements), loaded on first use only
+from src.ner.spacy_model import get_nlp
 
-def run_ner_on_text(text: str):
-    """
-    Return list of entities: [{'text':..., 'label':..., 'start':..., 'end':..., 'source':...}, ...]
-    """
-    text = text or ""
-    if HAS_CUSTOM_NER:
-        try:
-            ents = final_ner_logic_v4(text)
-            # Normalize to standard keys if required by your implementation:
-            normalized = []
-            for e in ents:
-                text_val = e.get("text") or e.get("entity") or ""
-                label_val = e.get("label") or e.get("type") or "MISC"
-
-                normalized.append({
-                    "text": text_val,
-                    "label": label_val,
-                    "start": e.get("start"),
-                    "end": e.get("end"),
-                    "source": e.get("source", "custom"),
-                    "confidence": e.get("confidence")
-                })
-
-            return normalized
-        except Exception as ex:
-            logger.exception("Custom NER failed, falling back to spaCy: %s", ex)
 
-    # spaCy fallback
-    doc = nlp(text)
+def _normalize_custom(ents):
+    # Normalize to standard keys if required by your implementation:
+    normalized = []
+    for e in ents:
+        text_val = e.get("text") or e.get("entity") or ""
+        label_val = e.get("label") or e.get("type") or "MISC"
+
+        normalized.append({
+            "text": text_val,
+            "label": label_val,
+            "start": e.get("start"),
+            "end": e.get("end"),
+            "source": e.get("source", "custom"),
+            "confidence": e.get("confidence")
+        })
+
+    return normalized
+
+
+def _spacy_entities(doc):
     out = []
     for ent in doc.ents:
         out.append({
@@ -60,13 +52,45 @@ def run_ner_on_text(text: str):
         })
     return out
 
-def run_ner(doc: dict):
+
+def run_ner_on_text(text: str):
     """
-    Enrich the doc with a `entities` field (list of entity dicts).
-    Returns the doc (modified).
+    Return list of entities: [{'text':..., 'label':..., 'start':..., 'end':..., 'source':...}, ...]
     """
-    combined = canonical_text(doc)
-    entities = run_ner_on_text(combined)
+    text = text or ""
+    if HAS_CUSTOM_NER:
+        try:
+            ents = final_ner_logic_v4(text)
+            return _normalize_custom(ents)
+        except Exception as ex:
+            logger.exception("Custom NER failed, falling back to spaCy: %s", ex)
+
+    # spaCy fallback
+    return _spacy_entities(get_nlp("en_core_web_sm")(text))
+
+
+def run_ner_on_texts(texts, batch_size: int = None, n_process: int = None):
+    """
+    Batch version of run_ner_on_text (spaCy nlp.pipe under the hood).
+    Returns one entity list per input text.
+    """
+    texts = [t or "" for t in texts]
+    batch_size = batch_size or Config.NER_BATCH_SIZE
+    n_process = n_process or Config.NER_N_PROCESS
+
+    if HAS_CUSTOM_NER:
+        try:
+            batches = final_ner_logic_v4_batch(texts, batch_size=batch_size, n_process=n_process)
+            return [_normalize_custom(ents) for ents in batches]
+        except Exception as ex:
+            logger.exception("Custom batch NER failed, falling back to spaCy: %s", ex)
+
+    # spaCy fallback
+    docs = get_nlp("en_core_web_sm").pipe(texts, batch_size=batch_size, n_process=n_process)
+    return [_spacy_entities(doc) for doc in docs]
+
+
+def _unique_entities(entities):
     # Optionally deduplicate overlapping entities by text (very simple)
     seen = set()
     unique = []
@@ -78,5 +102,26 @@ def run_ner(doc: dict):
             continue
         seen.add(key)
         unique.append(e)
-    doc["entities"] = unique
+    return unique
+
+
+def run_ner(doc: dict):
+    """
+    Enrich the doc with a `entities` field (list of entity dicts).
+    Returns the doc (modified).
+    """
+    combined = canonical_text(doc)
+    entities = run_ner_on_text(combined)
+    doc["entities"] = _unique_entities(entities)
     return doc
+
+
+def run_ner_batch(docs, batch_size: int = None, n_process: int = None):
+    """
+    Batch version of run_ner: one nlp.pipe pass over all docs.
+    Returns the docs (modified in place).
+    """
+    texts = [canonical_text(d) for d in docs]
+    for doc, entities in zip(docs, run_ner_on_texts(texts, batch_size, n_process)):
+        doc["entities"] = _unique_entities(entities)
+    return docs
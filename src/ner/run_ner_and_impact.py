@@ -2,10 +2,13 @@
 
 import json
 from pathlib import Path
-from src.ner.ner_agent import run_ner
+from src.ner.ner_agent import run_ner_batch
 from src.impact.impact_mapper import ImpactMapper
 from src.utils.logger import get_logger
+from src.utils import canonical_text, chunked, published_ts
+from src.utils.json_stream import iter_articles, ArticleWriter
 from src.vector.vector_store import VectorStore
+from src.config.config import Config
 
 logger = get_logger("run_ner_and_impact")
 
@@ -13,91 +16,82 @@ logger = get_logger("run_ner_and_impact")
 def run(
     input_path: str = "data/news_final_with_story.json",
     output_path: str = "data/news_final_enriched.json",
-    mapping_csv: str | None = None
+    mapping_csv: str | None = None,
+    batch_size: int | None = None
 ):
 
     in_p = Path(input_path)
     out_p = Path(output_path)
+    batch_size = batch_size or Config.NER_BATCH_SIZE
 
     if not in_p.exists():
         raise FileNotFoundError(f"Input not found: {in_p.resolve()}")
 
     # -------------------------------------------
-    # Load input JSON
+    # 1) Build ImpactMapper
     # -------------------------------------------
-    with open(in_p, "r", encoding="utf-8") as f:
-        docs = json.load(f)
-
-    # -------------------------------------------
-    # 1) Run NER FIRST on all documents
-    # -------------------------------------------
-    logger.info("Running NER on all documents...")
-    ner_processed_docs = []
-    for d in docs:
-        ner_processed_docs.append(run_ner(d))
-
-    # -------------------------------------------
-    # 2) Build ImpactMapper AFTER NER extraction
-    # -------------------------------------------
-    logger.info("Building ImpactMapper from extracted entities...")
+    logger.info("Building ImpactMapper...")
     mapper = ImpactMapper(mapping_csv)
 
     if not mapper.table:
+        # No CSV: auto-map from ORG entities (needs one extra NER pass)
         company_names = []
-        for d in ner_processed_docs:
-            for e in d.get("entities", []):
-                if e.get("label", "").upper() in ("ORG", "COMPANY"):
-                    company_names.append(e.get("text"))
+        for batch in chunked(iter_articles(in_p), batch_size):
+            for d in run_ner_batch(batch):
+                for e in d.get("entities", []):
+                    if e.get("label", "").upper() in ("ORG", "COMPANY"):
+                        company_names.append(e.get("text"))
         mapper.build_auto_mapping(company_names)
 
     # -------------------------------------------
-    # 3) Compute impacts AND update Chroma metadata
+    # 2) Stream: NER → impacts → Chroma metadata → output
     # -------------------------------------------
-    logger.info("Computing impacts + updating Chroma metadata...")
+    logger.info("Running NER + impacts + Chroma metadata updates (streaming)...")
     vs = VectorStore()
-    final_docs = []
-
-    for d in ner_processed_docs:
-        # Compute impacts
-        d = mapper.compute_impacts(d)
-
-        # Update Chroma metadata
-        try:
-            impacts_json = json.dumps(d.get("impacts", []), ensure_ascii=False)
-
-            metadata = {
-                "title": d.get("title"),
-                "source": d.get("source"),
-                "published": d.get("published"),
-                "url": d.get("url"),
-                "story_id": str(d.get("story_id")),
-                "impacts": impacts_json
-            }
-
-            text = (d.get("title") or "") + "\n\n" + (d.get("description") or "")
-
-            vs.collection.upsert(
-                ids=[str(d["id"])],
-                documents=[text],
-                metadatas=[metadata],
-                embeddings=[vs.embedder.embed_text(text)]
-            )
-
-        except Exception as ex:
-            logger.exception(
-                "Failed to update vector metadata for id=%s: %s",
-                d.get("id"), ex
-            )
-
-        final_docs.append(d)
-
-    # -------------------------------------------
-    # 4) Save enriched output JSON
-    # -------------------------------------------
-    with open(out_p, "w", encoding="utf-8") as f:
-        json.dump(final_docs, f, indent=2, ensure_ascii=False)
 
-    logger.info("Wrote enriched dataset to %s", out_p.resolve())
+    with ArticleWriter(out_p) as writer:
+        for batch in chunked(iter_articles(in_p), batch_size):
+            docs = mapper.compute_impacts_batch(run_ner_batch(batch))
+
+            # Update Chroma metadata (one upsert per batch)
+            try:
+                metadatas = []
+                for d in docs:
+                    meta = {
+                        "title": d.get("title"),
+                        "source": d.get("source"),
+                        "published": d.get("published"),
+                        "url": d.get("url"),
+                        "story_id": str(d.get("story_id")),
+                        "impacts": json.dumps(d.get("impacts", []), ensure_ascii=False)
+                    }
+                    ts = published_ts(d)
+                    if ts is not None:
+                        meta["published_ts"] = ts
+                    metadatas.append(meta)
+
+                # canonical text → same cache key run_dedupe already embedded
+                texts = [canonical_text(d) for d in docs]
+
+                vs.upsert(
+                    [d["id"] for d in docs],
+                    texts,
+                    metadatas,
+                    vs.embedder.embed_batch(texts)
+                )
+
+            except Exception as ex:
+                logger.exception(
+                    "Failed to update vector metadata for ids=%s: %s",
+                    [d.get("id") for d in docs], ex
+                )
+
+            for d in docs:
+                writer.write(d)
+
+    logger.info("Wrote %d enriched articles to %s", writer.count, out_p.resolve())
+    if hasattr(vs.embedder, "stats"):
+        logger.info("Embedding cache: %s", vs.embedder.stats())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,17 @@
+# src/ner/spacy_model.py
+
+from src.utils.registry import get_resource
+
+DEFAULT_SPACY_MODEL = "en_core_web_sm"
+
+
+def get_nlp(model_name: str = DEFAULT_SPACY_MODEL):
+    """
+    The process-wide spaCy pipeline for `model_name` (loaded once, shared
+    by custom NER, the spaCy fallback and the query engine).
+    """
+    def load():
+        import spacy
+        return spacy.load(model_name)
+
+    return get_resource(f"spacy:{model_name}", load)
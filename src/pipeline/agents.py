@@ -2,11 +2,16 @@
 
 import json
 from src.dedupe.deduper import Deduper
-from src.ner.ner_agent import run_ner
+from src.utils import canonical_text, published_ts
+from src.ner.ner_agent import run_ner, run_ner_batch
 from src.impact.impact_mapper import ImpactMapper
-from src.db.crud import upsert_article
+from src.db.crud import bulk_upsert_articles
+from src.db.fts import index_articles
 from src.db.db import SessionLocal
 from src.vector.vector_store import VectorStore
+from src.utils.registry import get_resource
+from src.query.query_cache import bump_ingest_generation
+from src.llm.enrichment import Enricher
 from src.utils.logger import get_logger
 
 logger = get_logger("PipelineAgents")
@@ -25,16 +30,24 @@ def ingest_agent(data: dict):
     }
     """
     logger.info(f"[INGEST] Received article ID={data.get('id')}")
+    # parse the RFC-822 date once; DB and Chroma store the epoch value
+    data["published_ts"] = published_ts(data)
     return data
 
 
 # ------------------------
 # Dedup Agent
 # ------------------------
-deduper = Deduper(top_k=5, threshold=0.90)
+def get_deduper() -> Deduper:
+    # built on first use (loads the model and warms its indexes from Chroma)
+    return get_resource("deduper", lambda: Deduper(top_k=5, threshold=0.90))
+
+
 def dedup_agent(data: dict):
     logger.info(f"[DEDUP] Processing article ID={data.get('id')}")
-    updated = deduper.assign_story_id_and_update(data)
+    # Embedding (computed once, or reused for near-exact copies) is left in
+    # data["_embedding"]; the vector agent reuses it and does the only Chroma write
+    updated = get_deduper().assign_story_id_and_update(data, upsert=False)
     return updated
 
 
@@ -50,10 +63,13 @@ def ner_agent(data: dict):
 # ------------------------
 # Impact Agent
 # ------------------------
-mapper = ImpactMapper(mapping_csv="data/company_to_ticker.csv")
+def get_mapper() -> ImpactMapper:
+    return get_resource("impact_mapper", lambda: ImpactMapper(mapping_csv="data/company_to_ticker.csv"))
+
+
 def impact_agent(data: dict):
     logger.info(f"[IMPACT] Mapping impacts for ID={data.get('id')}")
-    data = mapper.compute_impacts(data)
+    data = get_mapper().compute_impacts(data)
     return data
 
 
@@ -63,19 +79,50 @@ def impact_agent(data: dict):
 def storage_agent(data: dict):
     logger.info(f"[STORE] Saving article ID={data.get('id')} to DB")
     db = SessionLocal()
-    upsert_article(db, data)
-    db.close()
+    try:
+        # full-text index row + article rows in one transaction
+        index_articles(db, [data])
+        bulk_upsert_articles(db, [data])
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
     return data
 
 
 # ------------------------
-# Vector Index Agent
+# Enrichment Agent (optional, background)
 # ------------------------
-vs = VectorStore()
+def get_enricher() -> Enricher:
+    # built on first enrichment (the queue and workers are only needed with LLM_ENRICH_ENABLED)
+    return get_resource("enricher", Enricher)
 
-def vector_agent(data: dict):
-    logger.info(f"[VECTOR] Indexing article ID={data.get('id')}")
 
+def _enrich_item(data: dict):
+    text, _ = _vector_record(data)
+    companies = list(dict.fromkeys(
+        imp["company"] for imp in data.get("impacts", []) if imp.get("company")
+    ))
+    # same title/body the query engine will summarise, so the stored keys match
+    return {"id": str(data["id"]), "title": data.get("title") or "", "body": text, "companies": companies}
+
+
+def enrich_agent(data: dict):
+    logger.info(f"[ENRICH] Queueing LLM enrichment for ID={data.get('id')}")
+    get_enricher().submit([_enrich_item(data)])
+    return data
+
+
+# ------------------------
+# Vector Index Agent
+# ------------------------
+vs = VectorStore()  # cheap: client/collection/embedder resolve lazily
+
+def _vector_record(data: dict):
+    """
+    Build the (text, metadata) pair stored in Chroma for one article.
+    """
     # Extract title + full description cleanly
     title = data.get("title") or ""
     desc = data.get("description") or ""
@@ -99,14 +146,117 @@ def vector_agent(data: dict):
         "story_id": str(data.get("story_id")),
         "impacts": impacts_json
     }
+    # numeric key for date-range filters (Chroma rejects None values)
+    ts = published_ts(data)
+    if ts is not None:
+        metadata["published_ts"] = ts
+    return text, metadata
+
+
+def _pop_embedding(data: dict, text: str):
+    """
+    Take the embedding computed by the dedup agent out of the state.
+    Returns None when it does not describe `text` (short-article padding).
+    """
+    emb = data.pop("_embedding", None)
+    if emb is None or text != canonical_text(data):
+        return None
+    return emb
+
+
+def vector_agent(data: dict):
+    logger.info(f"[VECTOR] Indexing article ID={data.get('id')}")
+
+    text, metadata = _vector_record(data)
+    embedding = _pop_embedding(data, text)
+    if embedding is None:
+        embedding = vs.embedder.embed_text(text)
 
     # Store in Chroma
-    vs.collection.upsert(
-        ids=[str(data["id"])],
-        documents=[text],
-        metadatas=[metadata],
-        embeddings=[vs.embedder.embed_text(text)]
-    )
+    vs.upsert([data["id"]], [text], [metadata], embedding)
+    bump_ingest_generation()
 
     return data
 
+
+# ========================================================
+# Batch-mode agents
+# State = {"articles": [article dict, ...]}
+# ========================================================
+
+def ingest_batch_agent(state: dict):
+    articles = state.get("articles", [])
+    logger.info(f"[INGEST] Received batch of {len(articles)} articles")
+    for a in articles:
+        a["published_ts"] = published_ts(a)
+    return {"articles": articles}
+
+
+def dedup_batch_agent(state: dict):
+    articles = state.get("articles", [])
+    logger.info(f"[DEDUP] Processing batch of {len(articles)} articles")
+    deduped = get_deduper().assign_story_ids_batch(articles, upsert=False)
+    return {"articles": deduped}
+
+
+def ner_batch_agent(state: dict):
+    articles = state.get("articles", [])
+    logger.info(f"[NER] Extracting entities for batch of {len(articles)} articles")
+    return {"articles": run_ner_batch(articles)}
+
+
+def impact_batch_agent(state: dict):
+    articles = state.get("articles", [])
+    logger.info(f"[IMPACT] Mapping impacts for batch of {len(articles)} articles")
+    return {"articles": get_mapper().compute_impacts_batch(articles)}
+
+
+def storage_batch_agent(state: dict):
+    articles = state.get("articles", [])
+    logger.info(f"[STORE] Saving batch of {len(articles)} articles to DB")
+    db = SessionLocal()
+    try:
+        index_articles(db, articles)
+        bulk_upsert_articles(db, articles)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return {"articles": articles}
+
+
+def enrich_batch_agent(state: dict):
+    articles = state.get("articles", [])
+    logger.info(f"[ENRICH] Queueing LLM enrichment for batch of {len(articles)} articles")
+    get_enricher().submit([_enrich_item(d) for d in articles])
+    return {"articles": articles}
+
+
+def vector_batch_agent(state: dict):
+    articles = state.get("articles", [])
+    if not articles:
+        return {"articles": articles}
+    logger.info(f"[VECTOR] Indexing batch of {len(articles)} articles")
+
+    records = [_vector_record(d) for d in articles]
+    texts = [text for text, _ in records]
+    embeddings = [_pop_embedding(d, text) for d, text in zip(articles, texts)]
+
+    # Only re-embed articles whose stored text differs from what dedupe embedded
+    missing = [i for i, emb in enumerate(embeddings) if emb is None]
+    if missing:
+        for i, emb in zip(missing, vs.embedder.embed_batch([texts[i] for i in missing])):
+            embeddings[i] = emb
+
+    # One multi-id upsert for the whole batch (rows stacked into one float32 matrix)
+    vs.upsert(
+        [d["id"] for d in articles],
+        texts,
+        [meta for _, meta in records],
+        embeddings
+    )
+    bump_ingest_generation()
+
+    return {"articles": articles}
+
@@ -1,21 +1,23 @@
 # src/pipeline/batch_ingest.py
 
-import json
 from pathlib import Path
 from src.pipeline.graph import build_pipeline
+from src.config.config import Config
+from src.utils import chunked
+from src.utils.json_stream import iter_articles
 
-pipeline = build_pipeline()
+pipeline = build_pipeline(batch=True)
 
-def run_batch(path="data/news_final_enriched.json"):
+def run_batch(path="data/news_final_enriched.json", batch_size: int | None = None):
     file = Path(path)
     if not file.exists():
         raise FileNotFoundError(file)
 
-    with open(file, "r", encoding="utf-8") as f:
-        docs = json.load(f)
+    batch_size = batch_size or Config.INGEST_BATCH_SIZE
 
-    for d in docs:
-        pipeline.invoke(d)
+    # stream the file; one graph invocation per micro-batch
+    for batch in chunked(iter_articles(file), batch_size):
+        pipeline.invoke({"articles": batch})
 
     print("Batch ingestion completed!")
 
@@ -1,37 +1,82 @@
 # src/pipeline/graph.py
 
 from langgraph.graph import StateGraph
+from src.config.config import Config
+from src.utils.registry import get_resource
 from src.pipeline.agents import (
     ingest_agent,
     dedup_agent,
     ner_agent,
     impact_agent,
     storage_agent,
-    vector_agent
+    enrich_agent,
+    vector_agent,
+    ingest_batch_agent,
+    dedup_batch_agent,
+    ner_batch_agent,
+    impact_batch_agent,
+    storage_batch_agent,
+    enrich_batch_agent,
+    vector_batch_agent
 )
 
 # Pipeline state is just a dict
+# (single mode: one article; batch mode: {"articles": [...]})
 State = dict
 
-def build_pipeline():
+def build_pipeline(batch: bool = False, node_wrapper=None):
+    """
+    Compile the ingest graph. node_wrapper(name, fn) -> fn, if given, wraps
+    every node function (the benchmarks use it to time each node).
+    """
     g = StateGraph(State)
 
+    if batch:
+        nodes = {
+            "ingest": ingest_batch_agent,
+            "dedup": dedup_batch_agent,
+            "ner": ner_batch_agent,
+            "impact": impact_batch_agent,
+            "store": storage_batch_agent,
+            "enrich": enrich_batch_agent,
+            "index": vector_batch_agent,
+        }
+    else:
+        nodes = {
+            "ingest": ingest_agent,
+            "dedup": dedup_agent,
+            "ner": ner_agent,
+            "impact": impact_agent,
+            "store": storage_agent,
+            "enrich": enrich_agent,
+            "index": vector_agent,
+        }
+
+    # LLM enrichment is opt-in (it only queues work; see Enricher)
+    if not Config.LLM_ENRICH_ENABLED:
+        nodes.pop("enrich")
+
     # Add nodes
-    g.add_node("ingest", ingest_agent)
-    g.add_node("dedup", dedup_agent)
-    g.add_node("ner", ner_agent)
-    g.add_node("impact", impact_agent)
-    g.add_node("store", storage_agent)
-    g.add_node("index", vector_agent)
+    for name, fn in nodes.items():
+        g.add_node(name, node_wrapper(name, fn) if node_wrapper else fn)
 
     # Define edges
     g.add_edge("ingest", "dedup")
     g.add_edge("dedup", "ner")
     g.add_edge("ner", "impact")
     g.add_edge("impact", "store")
-    g.add_edge("store", "index")
+    if "enrich" in nodes:
+        g.add_edge("store", "enrich")
+        g.add_edge("enrich", "index")
+    else:
+        g.add_edge("store", "index")
 
     # Start point
     g.set_entry_point("ingest")
 
     return g.compile()
+
+
+def get_pipeline(batch: bool = False):
+    """Shared compiled pipeline (single or batch mode), built on first use."""
+    return get_resource(f"pipeline:{'batch' if batch else 'single'}", lambda: build_pipeline(batch=batch))
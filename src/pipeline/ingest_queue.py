@@ -0,0 +1,180 @@
+# src/pipeline/ingest_queue.py
+
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from src.config.config import Config
+from src.utils.logger import get_logger
+
+logger = get_logger("IngestQueue")
+
+
+class QueueFullError(Exception):
+    """Raised when a submission does not fit in the bounded work queue."""
+
+
+class IngestQueue:
+    """
+    Bounded in-process work queue for asynchronous bulk ingestion.
+
+    submit() enqueues articles under a new job id and returns immediately;
+    background worker threads drain the queue in micro-batches through the
+    batch-mode pipeline and record per-job progress.
+    """
+
+    def __init__(
+        self,
+        pipeline,
+        maxsize: int = None,
+        num_workers: int = None,
+        batch_size: int = None,
+        batch_wait: float = None,
+        max_jobs: int = 1000
+    ):
+        self.pipeline = pipeline
+        self.maxsize = maxsize or Config.INGEST_QUEUE_MAXSIZE
+        self.num_workers = num_workers or Config.INGEST_WORKERS
+        self.batch_size = batch_size or Config.INGEST_BATCH_SIZE
+        self.batch_wait = batch_wait if batch_wait is not None else Config.INGEST_BATCH_WAIT
+        self.max_jobs = max_jobs
+
+        self._queue = queue.Queue(maxsize=self.maxsize)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers = []
+
+    # -----------------------------------
+    # Public API
+    # -----------------------------------
+    def submit(self, articles: list) -> str:
+        """
+        Enqueue all articles as one job. All-or-nothing: raises
+        QueueFullError if they do not all fit right now.
+        """
+        if not articles:
+            raise ValueError("No articles to ingest.")
+
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            free = self.maxsize - self._queue.qsize()
+            if len(articles) > free:
+                raise QueueFullError(
+                    f"Ingest queue full ({self._queue.qsize()}/{self.maxsize}); retry later."
+                )
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "total": len(articles),
+                "processed": 0,
+                "failed": 0,
+                "errors": [],
+                "created_at": time.time(),
+                "finished_at": None,
+            }
+            self._trim_jobs()
+            for a in articles:
+                self._queue.put_nowait((job_id, a))
+            self._ensure_workers()
+
+        logger.info(f"Queued job {job_id} with {len(articles)} articles")
+        return job_id
+
+    def get_job(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job, errors=list(job["errors"])) if job else None
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "maxsize": self.maxsize,
+            "workers": len(self._workers),
+            "jobs": len(self._jobs),
+        }
+
+    # -----------------------------------
+    # Workers
+    # -----------------------------------
+    def _ensure_workers(self):
+        # started lazily so importing the API does not spawn threads
+        self._workers = [w for w in self._workers if w.is_alive()]
+        while len(self._workers) < self.num_workers:
+            w = threading.Thread(
+                target=self._worker_loop,
+                name=f"ingest-worker-{len(self._workers)}",
+                daemon=True
+            )
+            w.start()
+            self._workers.append(w)
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker_loop(self):
+        while True:
+            batch = self._next_batch()
+            job_ids = [job_id for job_id, _ in batch]
+            self._mark_running(job_ids)
+            try:
+                self.pipeline.invoke({"articles": [a for _, a in batch]})
+                self._record(job_ids, error=None)
+            except Exception as ex:
+                logger.exception(f"Ingest batch of {len(batch)} failed, retrying per article: {ex}")
+                self._retry_individually(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _retry_individually(self, batch):
+        # isolate the bad article(s) so other jobs in the batch still land
+        for job_id, article in batch:
+            try:
+                self.pipeline.invoke({"articles": [article]})
+                self._record([job_id], error=None)
+            except Exception as ex:
+                logger.error(f"Ingest failed for article ID={article.get('id')}: {ex}")
+                self._record([job_id], error=str(ex))
+
+    def _mark_running(self, job_ids):
+        with self._lock:
+            for job_id in set(job_ids):
+                job = self._jobs.get(job_id)
+                if job and job["status"] == "queued":
+                    job["status"] = "running"
+
+    def _record(self, job_ids, error):
+        with self._lock:
+            for job_id in job_ids:
+                job = self._jobs.get(job_id)
+                if not job:
+                    continue
+                if error is None:
+                    job["processed"] += 1
+                else:
+                    job["failed"] += 1
+                    if error not in job["errors"]:
+                        job["errors"].append(error)
+                if job["processed"] + job["failed"] >= job["total"]:
+                    job["status"] = "completed" if not job["failed"] else "completed_with_errors"
+                    job["finished_at"] = time.time()
+
+    def _trim_jobs(self):
+        # forget the oldest finished jobs beyond max_jobs
+        while len(self._jobs) > self.max_jobs:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest["finished_at"] is None:
+                break
+            self._jobs.pop(oldest_id)
@@ -17,14 +17,14 @@ class QueryAgent:
         self._engine = None
 
     def _get_engine(self):
-        # Import and create engine lazily (only when needed)
+        # Import and create engine lazily (only when needed); one shared
+        # engine per process, so /warmup and every agent reuse it
         if self._engine is None:
-            from src.query.query_engine import QueryEngine  # local import
-            logger.info("Initializing QueryEngine (lazy)...")
-            self._engine = QueryEngine()
+            from src.query.query_engine import get_query_engine  # local import
+            self._engine = get_query_engine()
         return self._engine
 
-    def run(self, query: str) -> str:
+    def run(self, query: str, since=None, until=None) -> str:
         """
         Takes a user query, runs:
         - Query NER
@@ -33,15 +33,35 @@ class QueryAgent:
         - Ranking
         - Formatting
 
+        since/until optionally restrict results to a publish-date range.
         Returns final markdown string for the user.
         """
         logger.info(f"QueryAgent received query: {query}")
 
         try:
             engine = self._get_engine()
-            results = engine.search(query)
+            results = engine.search(query, since=since, until=until)
             formatted = AnswerFormatter.format_results(query, results)
             return formatted
         except Exception as ex:
             logger.exception(f"QueryAgent failed for query={query}: {ex}")
             return f"Sorry, I could not process your query due to an internal error.\n\nDetails: {ex}"
+
+    def stream(self, query: str, top_k: int = 10, since=None, until=None):
+        """
+        (event, data) pairs from QueryEngine.search_stream; a failure
+        mid-stream ends it with an "error" event.
+        """
+        logger.info(f"QueryAgent received streaming query: {query}")
+        try:
+            engine = self._get_engine()
+            yield from engine.search_stream(query, top_k=top_k, since=since, until=until)
+        except Exception as ex:
+            logger.exception(f"QueryAgent stream failed for query={query}: {ex}")
+            yield "error", {"detail": str(ex)}
+
+    def stats(self) -> dict:
+        """Query cache hit ratio / latency (empty until the engine exists)."""
+        if self._engine is None:
+            return {"engine_loaded": False}
+        return {"engine_loaded": True, "cache": self._engine.cache_stats()}
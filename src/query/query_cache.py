@@ -0,0 +1,129 @@
+# src/query/query_cache.py
+
+import copy
+import threading
+import time
+from collections import OrderedDict, deque
+
+from src.config.config import Config
+from src.utils.logger import get_logger
+
+logger = get_logger("QueryCache")
+
+# -----------------------------------------------------
+# Ingest generation: bumped whenever new vectors land in
+# Chroma, so cached answers never outlive the corpus they
+# were computed against (in this process; TTL covers the rest).
+# -----------------------------------------------------
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def ingest_generation() -> int:
+    return _generation
+
+
+def bump_ingest_generation() -> int:
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        return _generation
+
+
+def normalize_query(query: str) -> str:
+    # whitespace only: query NER is case-sensitive, so case is kept
+    return " ".join((query or "").split())
+
+
+class QueryCache:
+    """
+    TTL + LRU cache of QueryEngine.search results keyed on
+    (normalised query, top_k, since, until). Entries computed under an older ingest
+    generation are treated as misses. Also tracks hit ratio and latency.
+    """
+
+    def __init__(self, max_entries: int = None, ttl: float = None, latency_window: int = 1000):
+        self.max_entries = max_entries or Config.QUERY_CACHE_MAX_ENTRIES
+        self.ttl = ttl if ttl is not None else Config.QUERY_CACHE_TTL
+        self._entries = OrderedDict()  # key -> (generation, stored_at, result)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidated = 0
+        self._latency = {"hit": deque(maxlen=latency_window), "miss": deque(maxlen=latency_window)}
+
+    @staticmethod
+    def key(query: str, top_k: int, since: int = None, until: int = None):
+        return normalize_query(query), int(top_k), since, until
+
+    def get(self, query: str, top_k: int, since: int = None, until: int = None):
+        key = self.key(query, top_k, since, until)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                generation, stored_at, result = entry
+                if generation != ingest_generation():
+                    self.invalidated += 1
+                    del self._entries[key]
+                elif now - stored_at > self.ttl:
+                    self.expired += 1
+                    del self._entries[key]
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(result)
+            self.misses += 1
+        return None
+
+    def put(self, query: str, top_k: int, result, generation: int, since: int = None, until: int = None):
+        """
+        Store a result computed under `generation` (read before the search
+        started, so an ingest that races the search invalidates it).
+        """
+        with self._lock:
+            key = self.key(query, top_k, since, until)
+            self._entries[key] = (generation, time.monotonic(), copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_latency(self, hit: bool, seconds: float):
+        with self._lock:
+            self._latency["hit" if hit else "miss"].append(seconds)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _summarize(samples):
+        if not samples:
+            return {"count": 0, "avg_ms": None, "p95_ms": None}
+        ordered = sorted(samples)
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+        return {
+            "count": len(ordered),
+            "avg_ms": round(1000 * sum(ordered) / len(ordered), 2),
+            "p95_ms": round(1000 * p95, 2),
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "generation": ingest_generation(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "invalidated": self.invalidated,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "latency": {
+                    "hit": self._summarize(self._latency["hit"]),
+                    "miss": self._summarize(self._latency["miss"]),
+                },
+            }
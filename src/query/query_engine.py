@@ -1,16 +1,53 @@
 # src/query/query_engine.py
 
 import json
-import re
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
 
-from src.vector.vector_store import VectorStore
+from src.vector.vector_store import VectorStore, normalize_rows
 from src.ner.custom_ner import final_ner_logic_v4
 from src.impact.impact_mapper import ImpactMapper
+from src.impact.company_matcher import get_company_matcher, compile_terms
+from src.query.query_cache import QueryCache, ingest_generation
+from src.config.config import Config
+from src.utils import parse_timestamp
 from src.utils.logger import get_logger
 
 logger = get_logger("QueryEngine")
 
+_llm_executor = None
+_llm_executor_lock = threading.Lock()
+_lexical_executor = None
+_lexical_executor_lock = threading.Lock()
+
+
+def _get_llm_executor() -> ThreadPoolExecutor:
+    # shared by every engine; each call runs under its query's deadline (see
+    # _call_before), so a slow or hung Ollama cannot build up a backlog here
+    global _llm_executor
+    with _llm_executor_lock:
+        if _llm_executor is None:
+            _llm_executor = ThreadPoolExecutor(
+                max_workers=max(1, Config.LLM_MAX_CONCURRENCY),
+                thread_name_prefix="llm"
+            )
+        return _llm_executor
+
+def _call_before(deadline, fn, *args):
+    """
+    fn(*args, timeout=<seconds left>) for a query-time LLM call; a call
+    still queued when its query's deadline passed is skipped.
+    """
+    if deadline is None:
+        return fn(*args)
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("query budget spent before the call started")
+    return fn(*args, timeout=remaining)
+
+
 SECTOR_MAP = {
     "HDFC Bank": "BANKING",
     "ICICI Bank": "BANKING",
@@ -23,11 +60,83 @@ SECTOR_MAP = {
 }
 
 
+def _get_lexical_executor() -> ThreadPoolExecutor:
+    # runs the FTS5 lookup while the query is embedded and Chroma is searched
+    global _lexical_executor
+    with _lexical_executor_lock:
+        if _lexical_executor is None:
+            _lexical_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fts")
+        return _lexical_executor
+
+
+def resolve_date_range(since=None, until=None):
+    """
+    Normalise query date bounds (epoch seconds, ISO-8601 or RFC-822) to
+    epoch seconds; a bare "YYYY-MM-DD" until covers that whole day.
+    Raises ValueError on an unparseable bound.
+    """
+    bounds = []
+    for name, value, end_of_day in (("since", since, False), ("until", until, True)):
+        if value is None or value == "":
+            bounds.append(None)
+            continue
+        ts = parse_timestamp(value, end_of_day=end_of_day)
+        if ts is None:
+            raise ValueError(f"Unrecognised {name} date: {value!r}")
+        bounds.append(ts)
+    return tuple(bounds)
+
+
+def chroma_date_filter(since: int = None, until: int = None):
+    """Chroma `where` clause on the numeric published_ts metadata key."""
+    clauses = []
+    if since is not None:
+        clauses.append({"published_ts": {"$gte": since}})
+    if until is not None:
+        clauses.append({"published_ts": {"$lte": until}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def reciprocal_rank_fusion(rankings, k: int = 60):
+    """
+    Merge ranked id lists: score(id) = sum of 1 / (k + rank) over the lists
+    it appears in (rank from 1). Returns ids best first; ties keep the
+    order of first appearance.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda d: scores[d], reverse=True)
+
+
+def _cosine_distances(query_embedding, embeddings):
+    # same metric as the collection ("hnsw:space": "cosine")
+    q = normalize_rows(query_embedding)[0]
+    m = normalize_rows(embeddings)
+    return (1.0 - m @ q).tolist()
+
+
+def get_query_engine() -> "QueryEngine":
+    from src.utils.registry import get_resource
+
+    def build():
+        logger.info("Initializing QueryEngine (lazy)...")
+        return QueryEngine()
+
+    return get_resource("query_engine", build)
+
+
 class QueryEngine:
 
     def __init__(self):
         self.vs = VectorStore()
         self.mapper = ImpactMapper()
+        self.cache = QueryCache() if Config.QUERY_CACHE_ENABLED else None
+        self._llm_store = None
+        self._llm_store_failed = False
 
     # -----------------------------------------------------
     # STEP 1: Extract NER entities
@@ -53,8 +162,138 @@ class QueryEngine:
     # -----------------------------------------------------
     # STEP 3: Ultra-strict ranking engine
     # -----------------------------------------------------
-    def search(self, query: str, top_k=10):
+    def search(self, query: str, top_k=10, since=None, until=None):
+        """
+        Cached front of _search(): repeated queries within the TTL are
+        served from memory until the next ingest bumps the generation.
+        since/until (epoch seconds or date strings) restrict results to a
+        publish-date range.
+        """
+        start = time.perf_counter()
+        since, until = resolve_date_range(since, until)
+        if self.cache is None:
+            return self._search(query, top_k, since, until)
+
+        cached = self.cache.get(query, top_k, since, until)
+        if cached is not None:
+            self.cache.record_latency(True, time.perf_counter() - start)
+            return cached
+
+        generation = ingest_generation()
+        result = self._search(query, top_k, since, until)
+        # never pin placeholders, errors or "unavailable" answers: the next
+        # query should try the LLM again
+        if not any(item.get("llm_timed_out") or item.get("llm_failed") for item in result["results"]):
+            self.cache.put(query, top_k, result, generation, since, until)
+        self.cache.record_latency(False, time.perf_counter() - start)
+        return result
+
+    def _get_llm_store(self):
+        # stored summaries/explanations (precomputed at ingest); lazy like the LLM
+        if self._llm_store is None and Config.LLM_STORE_ENABLED and not self._llm_store_failed:
+            try:
+                from src.llm.summary_store import SummaryStore
+                self._llm_store = SummaryStore()
+            except Exception as ex:
+                logger.warning(f"LLM store unavailable, using live calls only: {ex}")
+                self._llm_store_failed = True
+        return self._llm_store
+
+    def cache_stats(self):
+        return self.cache.stats() if self.cache is not None else {"enabled": False}
+
+    def _search(self, query: str, top_k=10, since=None, until=None):
+        started = time.monotonic()
+        ranked = self.rank(query, top_k, since, until)
+        self._add_llm_answers(ranked, started)
+        return ranked
+
+    def _lexical_ids(self, query: str, top_k: int, since=None, until=None):
+        from src.db.db import SessionLocal
+        from src.db import fts
+        try:
+            with SessionLocal() as db:
+                hits = fts.search(db, query, limit=top_k, since=since, until=until)
+                return [art_id for art_id, _ in hits]
+        except Exception as ex:
+            logger.warning(f"Full-text search unavailable, vector results only: {ex}")
+            return []
+
+    def _ticker_ids(self, tickers, limit: int, since=None, until=None):
+        from src.db.db import SessionLocal
+        from src.db.crud import article_ids_for_tickers
+        try:
+            with SessionLocal() as db:
+                ids = article_ids_for_tickers(db, tickers, limit, since=since, until=until)
+                return [str(art_id) for art_id in ids]
+        except Exception as ex:
+            logger.warning(f"Ticker candidate lookup failed: {ex}")
+            return []
+
+    def _retrieve(self, query: str, top_k: int, tickers=None, since=None, until=None):
+        """
+        Candidate retrieval: Chroma nearest neighbours, plus (hybrid mode)
+        BM25 hits from the SQLite FTS5 index fetched in parallel and merged
+        by reciprocal rank fusion, cut to top_k. When the query resolved to
+        tickers, the most recent articles impacting them (impacts table) are
+        added on top. A since/until range is pushed down to every source
+        (Chroma `where`, SQL range scans). Returns parallel lists
+        (ids, documents, metadatas, distances).
+        """
+        executor = _get_lexical_executor()
+        lexical = None
+        if Config.HYBRID_SEARCH_ENABLED:
+            lexical = executor.submit(self._lexical_ids, query, top_k, since, until)
+        by_ticker = None
+        if tickers and Config.TICKER_CANDIDATES_LIMIT > 0:
+            by_ticker = executor.submit(
+                self._ticker_ids, sorted(tickers), Config.TICKER_CANDIDATES_LIMIT, since, until
+            )
 
+        # one call: ids + documents + metadatas + distances (no embeddings)
+        query_embedding = self.vs.embedder.embed_text(query)
+        results = self.vs.query_embedding(
+            query_embedding, top_k=top_k, where=chroma_date_filter(since, until)
+        )
+        ids = results["ids"][0]
+        documents = (results.get("documents") or [[]])[0] or [None] * len(ids)
+        metadatas = (results.get("metadatas") or [[]])[0] or [None] * len(ids)
+        distances = results["distances"][0]
+
+        lexical_ids = lexical.result() if lexical is not None else []
+        ticker_ids = by_ticker.result() if by_ticker is not None else []
+        if not lexical_ids and not ticker_ids:
+            return list(ids), list(documents), list(metadatas), list(distances)
+
+        fused = ids
+        if lexical_ids:
+            fused = reciprocal_rank_fusion([ids, lexical_ids], k=Config.HYBRID_RRF_K)[:top_k]
+        # union: ticker candidates are kept even beyond top_k
+        fused = list(dict.fromkeys([*fused, *ticker_ids]))
+        by_id = {art_id: [d, m, dist] for art_id, d, m, dist in zip(ids, documents, metadatas, distances)}
+
+        # candidates Chroma did not return: one get, distance computed like Chroma's
+        extra = [art_id for art_id in fused if art_id not in by_id]
+        if extra:
+            got = self.vs.collection.get(ids=extra, include=["documents", "metadatas", "embeddings"])
+            if len(got["ids"]):
+                dists = _cosine_distances(query_embedding, got["embeddings"])
+                for art_id, d, m, dist in zip(got["ids"], got["documents"], got["metadatas"], dists):
+                    by_id[art_id] = [d, m, dist]
+
+        fused = [art_id for art_id in fused if art_id in by_id]
+        return (
+            fused,
+            [by_id[a][0] for a in fused],
+            [by_id[a][1] for a in fused],
+            [by_id[a][2] for a in fused],
+        )
+
+    def rank(self, query: str, top_k=10, since=None, until=None):
+        """
+        Steps 1-3 only: entities, expansion and the scored, sorted results
+        (no LLM calls). since/until are epoch seconds (see resolve_date_range).
+        """
         logger.info("Using ULTRA-STRICT ranking engine...")
 
         query_entities = self.extract_query_entities(query)
@@ -62,34 +301,51 @@ class QueryEngine:
 
         companies = set(expanded["companies"])
         tickers = set(expanded["tickers"])
+        companies_lower = {c.lower() for c in companies}
+
+        # Resolve query companies/tickers to mapping rows once per query;
+        # anything not in the mapping gets one compiled pattern per query.
+        matcher = get_company_matcher()
+        target_tickers = set()
+        unmapped = []
+        for term in companies | tickers:
+            row = matcher.lookup(term)
+            if row:
+                target_tickers.add(row["ticker"])
+            else:
+                unmapped.append(term)
+        unmapped_pattern = compile_terms(unmapped)
+
+        ids, documents, metadatas, distances = self._retrieve(
+            query, top_k, tickers=target_tickers, since=since, until=until
+        )
+        now = time.time()
+
+        # backfill any missing fields with a single multi-id get
+        missing = [art_id for art_id, d, m in zip(ids, documents, metadatas) if d is None or m is None]
+        if missing:
+            extra = self.vs.collection.get(ids=missing, include=["documents", "metadatas"])
+            by_id = dict(zip(extra["ids"], zip(extra["documents"], extra["metadatas"])))
+            for i, art_id in enumerate(ids):
+                if art_id in by_id:
+                    doc, meta = by_id[art_id]
+                    documents[i] = documents[i] if documents[i] is not None else doc
+                    metadatas[i] = metadatas[i] if metadatas[i] is not None else meta
 
-        results = self.vs.query(query, top_k=top_k)
         final_ranked = []
 
-        for i in range(len(results["ids"][0])):
-            art_id = results["ids"][0][i]
-            text = results["documents"][0][i]
-            dist = results["distances"][0][i]
-
-            meta = self.vs.collection.get(ids=[art_id])
-            metadata = meta["metadatas"][0]
+        for art_id, text, metadata, dist in zip(ids, documents, metadatas, distances):
+            metadata = metadata or {}
             impacts = json.loads(metadata.get("impacts", "[]"))
 
             # -------------------------------------------------------------
             # STRICT COMPANY MENTION CHECK
             # -------------------------------------------------------------
-            lower_text = (text or "").lower()
-
-            def mentions_company():
-                for c in companies:
-                    if re.search(rf"\b{re.escape(c.lower())}\b", lower_text):
-                        return True
-                for t in tickers:
-                    if t.lower() in lower_text:
-                        return True
-                return False
-
-            company_mentioned = mentions_company()
+            # single pass over the doc for every known name/alias/ticker
+            company_mentioned = bool(
+                (target_tickers and target_tickers & matcher.find_tickers(text or ""))
+                or (unmapped_pattern and unmapped_pattern.search(text or ""))
+            )
 
             # -------------------------------------------------------------
             # SCORING
@@ -101,7 +357,7 @@ class QueryEngine:
                 for imp in impacts
                 if (
                     imp["ticker"] in tickers
-                    or imp["company"].lower() in {c.lower() for c in companies}
+                    or imp["company"].lower() in companies_lower
                 )
             )
 
@@ -109,15 +365,15 @@ class QueryEngine:
             if not company_mentioned:
                 impact_score = -5
 
-            # Recency
+            # Recency (epoch metadata; vectors indexed before it existed
+            # fall back to parsing the published string)
             recency = 0
-            pub = metadata.get("published")
-            if pub:
-                try:
-                    dt = datetime.strptime(pub[:25], "%a, %d %b %Y %H:%M:%S")
-                    recency = max(0, 1 - (datetime.utcnow() - dt).days / 40)
-                except:
-                    pass
+            ts = metadata.get("published_ts")
+            if ts is None:
+                ts = parse_timestamp(metadata.get("published"))
+            if ts is not None:
+                days = (now - ts) // 86400
+                recency = max(0, 1 - days / 40)
 
             final_score = (
                 semantic * 0.70 +
@@ -141,40 +397,165 @@ class QueryEngine:
         # sort by final score
         final_ranked = sorted(final_ranked, key=lambda x: x["final_score"], reverse=True)
 
-        # -----------------------------------------------------
-        # STEP 4: LLM Summaries + Explanations (LAZY LOAD)
-        # -----------------------------------------------------
+        return {
+            "query": query,
+            "query_entities": query_entities,
+            "expanded": expanded,
+            "results": final_ranked,
+        }
+
+    def search_stream(self, query: str, top_k=10, since=None, until=None):
+        """
+        Streaming search: yields (event, data) pairs.
+        "entities" and "results" come as soon as ranking is done, then
+        "token" chunks and a final "answer" for each LLM field of the top
+        results (stored answers arrive as a single chunk), then "done".
+        LLM_QUERY_BUDGET bounds the whole stream: a field still streaming at
+        the deadline, and every field after it, is answered with the
+        timeout placeholder.
+        """
+        started = time.monotonic()
+        since, until = resolve_date_range(since, until)
+        ranked = self.rank(query, top_k, since, until)
+        yield "entities", {
+            "query": query,
+            "query_entities": ranked["query_entities"],
+            "expanded": ranked["expanded"],
+        }
+        # article bodies stay server-side
+        yield "results", {
+            "results": [{k: v for k, v in item.items() if k != "doc_text"} for item in ranked["results"]]
+        }
+
+        try:
+            from src.llm.service import (
+                summarize_article_stream, explain_impact_stream, LLM_ERROR_PREFIX, LLM_TIMEOUT_PLACEHOLDER
+            )
+        except ImportError:
+            summarize_article_stream = None
+            explain_impact_stream = None
+
+        store = self._get_llm_store() if summarize_article_stream else None
+        expanded = ranked["expanded"]
+        company = expanded["companies"][0] if expanded["companies"] else None
+        budget = Config.LLM_QUERY_BUDGET
+        deadline = started + budget if budget > 0 else None
+        timed_out = False
+
+        for item in ranked["results"][:Config.LLM_TOP_N]:
+            title = item["title"] or ""
+            body = item["doc_text"] or ""
+
+            # opened one at a time, each with what is left of the budget
+            sources = {"summary": None, "impact_explain": None}
+            if store:
+                sources["summary"] = partial(store.stream_summary, item["id"], title, body)
+            elif summarize_article_stream:
+                sources["summary"] = partial(summarize_article_stream, title, body)
+            if company and store:
+                sources["impact_explain"] = partial(store.stream_explanation, item["id"], title, body, company)
+            elif company and explain_impact_stream:
+                sources["impact_explain"] = partial(explain_impact_stream, title, body, company)
+
+            for field, source in sources.items():
+                if source is None:
+                    text = "LLM unavailable."
+                elif timed_out or (deadline is not None and time.monotonic() >= deadline):
+                    timed_out = True
+                    text = LLM_TIMEOUT_PLACEHOLDER
+                else:
+                    left = deadline - time.monotonic() if deadline is not None else None
+                    chunks = source(timeout=left)
+                    parts = []
+                    try:
+                        for chunk in chunks:
+                            parts.append(chunk)
+                            yield "token", {"id": item["id"], "field": field, "text": chunk}
+                            if deadline is not None and time.monotonic() >= deadline:
+                                timed_out = True
+                                break
+                    finally:
+                        chunks.close()  # drops the HTTP stream; partial answers are not stored
+                    text = "".join(parts).strip()
+                    if deadline is not None and time.monotonic() >= deadline and (
+                        timed_out or text.startswith(LLM_ERROR_PREFIX)
+                    ):
+                        timed_out = True
+                        text = LLM_TIMEOUT_PLACEHOLDER
+                yield "answer", {"id": item["id"], "field": field, "text": text}
+
+        if timed_out:
+            logger.warning(f"Streaming LLM answers exceeded the {budget}s query budget; placeholders returned")
+
+        yield "done", {"query": query}
+
+    # -----------------------------------------------------
+    # STEP 4: LLM Summaries + Explanations (LAZY LOAD)
+    # -----------------------------------------------------
+    def _add_llm_answers(self, ranked: dict, started: float):
+        final_ranked = ranked["results"]
+        expanded = ranked["expanded"]
+
         try:
-            from src.llm.service import summarize_article, explain_impact
-        except:
+            from src.llm.service import (
+                summarize_article, explain_impact, LLM_ERROR_PREFIX, LLM_TIMEOUT_PLACEHOLDER
+            )
+        except ImportError:
             summarize_article = None
             explain_impact = None
 
-        TOP_N = 2  # summarise ONLY top 2
+        TOP_N = Config.LLM_TOP_N  # summarise ONLY the top few
+        store = self._get_llm_store() if summarize_article else None
+        executor = _get_llm_executor()
+        budget = Config.LLM_QUERY_BUDGET
+        deadline = started + budget if budget > 0 else None
+        pending = {}  # future -> (item, field)
+
+        def submit(fn, *args):
+            return executor.submit(_call_before, deadline, fn, *args)
 
         for item in final_ranked[:TOP_N]:
-            doc_id = item["id"]
             title = item["title"] or ""
 
-            meta = self.vs.collection.get(ids=[doc_id])
-            body = meta["documents"][0] if meta["documents"] else ""
+            # body already came back with the query results
+            body = item["doc_text"] or ""
 
             # --- Summary ---
-            if summarize_article:
-                item["summary"] = summarize_article(title, body)
+            if store:
+                pending[submit(store.summary, item["id"], title, body, True)] = (item, "summary")
+            elif summarize_article:
+                pending[submit(summarize_article, title, body)] = (item, "summary")
             else:
                 item["summary"] = "LLM unavailable."
+                item["llm_failed"] = True
 
             # --- Impact Explanation ---
             company = expanded["companies"][0] if expanded["companies"] else None
-            if company and explain_impact:
-                item["impact_explain"] = explain_impact(title, body, company)
+            if company and store:
+                fut = submit(store.explanation, item["id"], title, body, company, True)
+                pending[fut] = (item, "impact_explain")
+            elif company and explain_impact:
+                pending[submit(explain_impact, title, body, company)] = (item, "impact_explain")
             else:
                 item["impact_explain"] = "LLM unavailable."
-
-        return {
-            "query": query,
-            "query_entities": query_entities,
-            "expanded": expanded,
-            "results": final_ranked,
-        }
+                if company:
+                    item["llm_failed"] = True
+
+        # every call runs concurrently; whatever misses the budget gets a placeholder
+        if pending:
+            timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            done, _ = wait(pending, timeout=timeout)
+            for fut, (item, field) in pending.items():
+                if fut in done:
+                    try:
+                        item[field] = fut.result()
+                    except Exception as ex:
+                        item[field] = f"{LLM_ERROR_PREFIX}: {ex}]"
+                    if not item[field] or item[field].startswith(LLM_ERROR_PREFIX):
+                        item["llm_failed"] = True
+                else:
+                    fut.cancel()  # still queued: never starts; running: ends at its timeout
+                    item[field] = LLM_TIMEOUT_PLACEHOLDER
+                    item["llm_timed_out"] = True
+            if any(item.get("llm_timed_out") for item, _ in pending.values()):
+                logger.warning(f"LLM calls exceeded the {budget}s query budget; placeholders returned")
@@ -1,5 +1,11 @@
 # src/utils/__init__.py
 
+import re
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+_DATE_ONLY_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
 def canonical_text(doc: dict) -> str:
     """
     Combine title + description into a clean canonical text
@@ -8,3 +14,62 @@ def canonical_text(doc: dict) -> str:
     title = doc.get("title", "") or ""
     desc = doc.get("description", "") or ""
     return f"{title}\n\n{desc}".strip()
+
+
+def chunked(items, size: int):
+    """
+    Yield successive lists of at most `size` items from any iterable.
+    """
+    if size < 1:
+        raise ValueError("Batch size must be >= 1.")
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_timestamp(value, end_of_day: bool = False):
+    """
+    Epoch seconds (UTC) from an RFC-822 date ("Tue, 23 Apr 2024 13:41:02
+    +0530", as in RSS feeds), an ISO-8601 date/datetime or a number.
+    Naive values are taken as UTC; with end_of_day, a bare "YYYY-MM-DD"
+    means the last second of that day. Returns None if unparseable.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    value = str(value).strip()
+    if not value:
+        return None
+    if value.lstrip("-").isdigit():
+        return int(value)
+
+    dt = None
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    if end_of_day and _DATE_ONLY_RE.match(value):
+        dt += timedelta(days=1, seconds=-1)
+    return int(dt.timestamp())
+
+
+def published_ts(doc: dict):
+    """
+    The article's publish time as epoch seconds: doc["published_ts"] when
+    ingest already parsed it, else parsed from doc["published"].
+    """
+    ts = doc.get("published_ts")
+    if isinstance(ts, int):
+        return ts
+    return parse_timestamp(doc.get("published"))
@@ -0,0 +1,142 @@
+# src/utils/json_stream.py
+
+import json
+import re
+from pathlib import Path
+
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+READ_CHUNK = 1 << 16
+# what ends a top-level scalar (number / true / false / null) in an array
+_SCALAR_END = re.compile(r"[,\]\s]")
+
+
+def _is_jsonl(path: Path) -> bool:
+    return path.suffix.lower() in JSONL_SUFFIXES
+
+
+def iter_articles(path):
+    """
+    Yield articles one at a time from a JSON array file or a JSONL file
+    (chosen by extension), without loading the whole file into memory.
+    """
+    path = Path(path)
+    if _is_jsonl(path):
+        yield from _iter_jsonl(path)
+    else:
+        yield from _iter_json_array(path)
+
+
+def _iter_jsonl(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as ex:
+                raise ValueError(f"{path}:{line_no}: invalid JSON line: {ex}") from ex
+
+
+def _iter_json_array(path: Path):
+    """
+    Incremental parser for a top-level JSON array: decodes one element at a
+    time with JSONDecoder.raw_decode over a small rolling buffer.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buf, pos, eof
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                eof = True
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def skip_ws():
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n":
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                fill()
+
+        fill()
+        if buf.startswith("\ufeff"):
+            pos = 1
+        skip_ws()
+        if pos >= len(buf) or buf[pos] != "[":
+            raise ValueError(f"{path}: expected a JSON array")
+        pos += 1
+
+        first = True
+        while True:
+            skip_ws()
+            if pos >= len(buf):
+                raise ValueError(f"{path}: unterminated JSON array")
+            if buf[pos] == "]":
+                return
+            if not first:
+                if buf[pos] != ",":
+                    raise ValueError(f"{path}: expected ',' between array items")
+                pos += 1
+                skip_ws()
+            first = False
+
+            while True:
+                # a scalar has no closing quote/bracket: "12.5" cut after "12."
+                # would decode as 12, so wait until its delimiter is buffered
+                if buf[pos] not in '{["' and not eof and not _SCALAR_END.search(buf, pos):
+                    fill()
+                    continue
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                    break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
+
+            pos = end
+            yield item
+
+
+class ArticleWriter:
+    """
+    Streaming counterpart of json.dump(docs, indent=2) / JSONL output.
+    Use as a context manager and call write() once per article; the JSON
+    array form produces the same text as dumping the full list at once.
+    """
+
+    def __init__(self, path, indent: int = 2):
+        self.path = Path(path)
+        self.indent = indent
+        self.jsonl = _is_jsonl(self.path)
+        self.count = 0
+        self._f = None
+
+    def __enter__(self):
+        self._f = open(self.path, "w", encoding="utf-8")
+        return self
+
+    def write(self, doc: dict):
+        if self.jsonl:
+            self._f.write(json.dumps(doc, ensure_ascii=False))
+            self._f.write("\n")
+        else:
+            pad = " " * self.indent
+            body = json.dumps(doc, indent=self.indent, ensure_ascii=False)
+            self._f.write("[\n" if self.count == 0 else ",\n")
+            self._f.write(pad + body.replace("\n", "\n" + pad))
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.jsonl:
+            self._f.write("\n]" if self.count else "[]")
+        self._f.close()
+        return False
@@ -0,0 +1,95 @@
+# src/utils/registry.py
+
+import os
+import threading
+import time
+
+from src.utils.logger import get_logger
+
+logger = get_logger("Registry")
+
+_MISSING = object()
+
+
+def rss_bytes():
+    """Current resident set size of this process, or None if unknown."""
+    try:
+        import psutil  # optional
+        return psutil.Process().memory_info().rss
+    except Exception:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return None
+
+
+class ResourceRegistry:
+    """
+    Process-wide registry of heavy shared resources (embedding model,
+    Chroma client/collection, spaCy pipeline, ...).
+
+    get(key, factory) builds each resource at most once, even when several
+    threads ask for it at the same time (per-key locks, so loading one
+    resource never blocks another), and records how long the load took
+    and how much resident memory it added.
+    """
+
+    def __init__(self):
+        self._items = {}
+        self._stats = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, factory):
+        item = self._items.get(key, _MISSING)
+        if item is not _MISSING:
+            return item
+
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            item = self._items.get(key, _MISSING)
+            if item is not _MISSING:
+                return item
+
+            rss_before = rss_bytes()
+            start = time.perf_counter()
+            item = factory()
+            seconds = time.perf_counter() - start
+            rss_after = rss_bytes()
+
+            # RSS delta is approximate when other threads allocate meanwhile
+            delta_mb = None
+            if rss_before is not None and rss_after is not None:
+                delta_mb = round((rss_after - rss_before) / 2**20, 1)
+
+            self._items[key] = item
+            self._stats[key] = {
+                "load_seconds": round(seconds, 3),
+                "rss_delta_mb": delta_mb,
+                "loaded_at": time.time(),
+            }
+            if delta_mb is None:
+                logger.info(f"Loaded {key} in {seconds:.2f}s")
+            else:
+                logger.info(f"Loaded {key} in {seconds:.2f}s (RSS {delta_mb:+} MB)")
+            return item
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self._items
+
+    def stats(self) -> dict:
+        rss = rss_bytes()
+        return {
+            "rss_mb": round(rss / 2**20, 1) if rss is not None else None,
+            "resources": {key: dict(s) for key, s in self._stats.items()},
+        }
+
+
+registry = ResourceRegistry()
+
+
+def get_resource(key: str, factory):
+    return registry.get(key, factory)
@@ -0,0 +1,345 @@
+# src/vector/embedding_cache.py
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from src.config.config import Config
+from src.utils.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = get_logger("EmbeddingCache")
+
+INDEX_FILE = "index.json"
+MATRIX_FILE = "vectors.f32"
+KEYS_FILE = "keys.bin"
+LOCK_FILE = "writer.lock"
+KEY_BYTES = 32  # raw sha256 per row
+
+
+def _safe_dirname(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+
+
+def _try_lock(f) -> bool:
+    """Non-blocking exclusive lock on an open file; False if someone holds it."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+class EmbeddingCache:
+    """
+    Content-addressed, on-disk embedding cache for one embedding model.
+
+    Layout (one directory per model):
+    - vectors.f32 : memory-mapped float32 matrix [capacity x dim]
+    - keys.bin    : memory-mapped sha256 of the text stored in each row
+    - index.json  : text hash -> row slot, stored in LRU order
+    - writer.lock : held by the one instance allowed to write
+
+    Bounded to `max_entries`; the least recently used entry is evicted
+    and its row reused when the cache is full.
+
+    One writer per directory: the first instance (in any process) to take
+    writer.lock owns slot allocation and the index; every other instance
+    (API workers, batch scripts running beside the API) opens the cache
+    read-only, reloads index.json when the writer rewrites it and never
+    writes. A row is only served when its keys.bin entry matches the
+    requested key, so a stale index can miss but never return another
+    text's vector.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: str | None = None,
+        max_entries: int | None = None,
+        flush_every: int = 256,
+        reload_interval: float = 5.0
+    ):
+        self.model_name = model_name
+        self.dir = Path(cache_dir or Config.EMBEDDING_CACHE_DIR) / _safe_dirname(model_name)
+        self.max_entries = max_entries or Config.EMBEDDING_CACHE_MAX_ENTRIES
+        self.flush_every = flush_every
+        self.reload_interval = reload_interval
+
+        self._lock = threading.Lock()
+        self._slots: "OrderedDict[str, int]" = OrderedDict()
+        self._free: List[int] = []
+        self._matrix = None
+        self._keys = None
+        self.capacity = self.max_entries
+        self.dim = None
+        self._dirty = 0
+        self._index_mtime = None
+        self._checked_at = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._lock_file = open(self.dir / LOCK_FILE, "a+b")
+        self.read_only = not _try_lock(self._lock_file)
+        if self.read_only:
+            logger.info(f"Embedding cache at {self.dir} has another writer; opening read-only")
+
+        self._load()
+        if not self.read_only:
+            atexit.register(self.flush)
+
+    # -----------------------------------
+    # Keys
+    # -----------------------------------
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+    # -----------------------------------
+    # Persistence
+    # -----------------------------------
+    def _load(self):
+        index_path = self.dir / INDEX_FILE
+        if not index_path.exists():
+            return
+        try:
+            self._index_mtime = index_path.stat().st_mtime_ns
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("model") != self.model_name:
+                logger.warning(f"Ignoring cache index for model {index.get('model')}")
+                return
+            # the writer may grow the files; readers map them as written
+            capacity = int(index["capacity"])
+            self.capacity = capacity if self.read_only else max(capacity, self.max_entries)
+            created = self._open_matrix(int(index["dim"]))
+            self._slots.clear()
+            for k, slot in index.get("slots", []):
+                self._slots[k] = int(slot)
+            if created:
+                # caches written before keys.bin existed: the writer's own
+                # index is authoritative, so record each row's key from it
+                for k, slot in self._slots.items():
+                    self._keys[slot] = np.frombuffer(bytes.fromhex(k), dtype=np.uint8)
+        except Exception as ex:
+            logger.warning(f"Embedding cache at {self.dir} unreadable, starting empty: {ex}")
+            self._slots.clear()
+            self._matrix = None
+            self._keys = None
+            self.dim = None
+            self.capacity = self.max_entries
+            return
+
+        if self.read_only:
+            return
+        used = set(self._slots.values())
+        self._free = [s for s in range(self.capacity - 1, -1, -1) if s not in used]
+        while len(self._slots) > self.max_entries:
+            self._evict_one()
+        logger.info(f"Loaded {len(self._slots)} cached embeddings from {self.dir}")
+
+    def _open_matrix(self, dim: int) -> bool:
+        """
+        Map vectors.f32 and keys.bin (the writer creates / grows them).
+        Returns True when keys.bin had to be created.
+        """
+        path = self.dir / MATRIX_FILE
+        keys_path = self.dir / KEYS_FILE
+        created = not keys_path.exists()
+        if self.read_only:
+            if created or not path.exists():
+                raise FileNotFoundError(f"{path} / {keys_path} not written yet")
+            self._matrix = np.memmap(path, dtype=np.float32, mode="r", shape=(self.capacity, dim))
+            self._keys = np.memmap(keys_path, dtype=np.uint8, mode="r", shape=(self.capacity, KEY_BYTES))
+            self.dim = dim
+            return False
+
+        for p, size in (
+            (path, self.capacity * dim * np.dtype(np.float32).itemsize),
+            (keys_path, self.capacity * KEY_BYTES),
+        ):
+            if not p.exists() or p.stat().st_size < size:
+                # grow (sparse) without touching existing rows
+                with open(p, "ab") as f:
+                    f.truncate(size)
+        self._matrix = np.memmap(path, dtype=np.float32, mode="r+", shape=(self.capacity, dim))
+        self._keys = np.memmap(keys_path, dtype=np.uint8, mode="r+", shape=(self.capacity, KEY_BYTES))
+        self.dim = dim
+        if not self._free and not self._slots:
+            self._free = list(range(self.capacity - 1, -1, -1))
+        return created
+
+    def _maybe_reload(self):
+        """Read-only instances: pick up the writer's latest index (at most every reload_interval)."""
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = (self.dir / INDEX_FILE).stat().st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._index_mtime:
+            self._load()
+
+    def flush(self):
+        """Write the key index (and dirty matrix pages) to disk."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self.read_only or self._matrix is None or not self._dirty:
+            return
+        self._matrix.flush()
+        self._keys.flush()
+        index = {
+            "model": self.model_name,
+            "dim": self.dim,
+            "capacity": self.capacity,
+            "slots": list(self._slots.items()),
+        }
+        tmp = self.dir / (INDEX_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp, self.dir / INDEX_FILE)
+        self._dirty = 0
+
+    # -----------------------------------
+    # Lookup / insert
+    # -----------------------------------
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        out = []
+        with self._lock:
+            if self.read_only:
+                self._maybe_reload()
+            for k in keys:
+                slot = self._slots.get(k)
+                vec = None
+                if slot is not None:
+                    digest = np.frombuffer(bytes.fromhex(k), dtype=np.uint8)
+                    # key before and after the copy: the writer clears a row's
+                    # key while it rewrites the vector
+                    if np.array_equal(self._keys[slot], digest):
+                        vec = np.array(self._matrix[slot], dtype=np.float32)
+                        if not np.array_equal(self._keys[slot], digest):
+                            vec = None
+                    if vec is None:
+                        del self._slots[k]  # row was reused for another text
+                if vec is None:
+                    self.misses += 1
+                    out.append(None)
+                    continue
+                self._slots.move_to_end(k)
+                self.hits += 1
+                out.append(vec)
+        return out
+
+    def put_many(self, keys: List[str], vectors):
+        if not keys or self.read_only:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self._matrix is None:
+                self._open_matrix(vectors.shape[1])
+            for k, vec in zip(keys, vectors):
+                slot = self._slots.get(k)
+                if slot is None:
+                    if len(self._slots) >= self.max_entries or not self._free:
+                        self._evict_one()
+                    slot = self._free.pop()
+                self._keys[slot] = 0
+                self._matrix[slot] = vec
+                self._keys[slot] = np.frombuffer(bytes.fromhex(k), dtype=np.uint8)
+                self._slots[k] = slot
+                self._slots.move_to_end(k)
+                self._dirty += 1
+            if self._dirty >= self.flush_every:
+                self._flush_locked()
+
+    def _evict_one(self):
+        _, slot = self._slots.popitem(last=False)
+        self._free.append(slot)
+        self.evictions += 1
+        self._dirty += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "mode": "read-only" if self.read_only else "writer",
+            "entries": len(self._slots),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class CachedEmbeddingService:
+    """
+    Read-through wrapper: same embed_text / embed_batch interface as
+    EmbeddingService (float32 vector / matrix), but only texts missing from
+    the cache hit the model.
+    """
+
+    def __init__(self, base, cache: EmbeddingCache):
+        self.base = base
+        self.model = getattr(base, "model", None)
+        self.model_name = cache.model_name
+        self.cache = cache
+
+    def embed_text(self, text: str) -> np.ndarray:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        if not texts:
+            return self.base.embed_batch(texts)
+        keys = [self.cache.key(t) for t in texts]
+        vectors = self.cache.get_many(keys)
+
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        fresh = None
+        todo = OrderedDict()
+        if missing:
+            # encode each distinct missing text once
+            for i in missing:
+                todo.setdefault(keys[i], texts[i])
+            fresh = np.asarray(self.base.embed_batch(list(todo.values())), dtype=np.float32)
+            self.cache.put_many(list(todo.keys()), fresh)
+            if len(todo) == len(texts):
+                return fresh  # all distinct misses: the model's matrix as is
+
+        dim = fresh.shape[1] if fresh is not None else len(next(v for v in vectors if v is not None))
+        out = np.empty((len(texts), dim), dtype=np.float32)
+        for i, v in enumerate(vectors):
+            if v is not None:
+                out[i] = v
+        if missing:
+            row = {k: r for r, k in enumerate(todo)}
+            out[missing] = fresh[[row[keys[i]] for i in missing]]
+        return out
+
+    def stats(self) -> dict:
+        return self.cache.stats()
@@ -1,19 +1,159 @@
-from sentence_transformers import SentenceTransformer
+# src/vector/embedding_service.py
+
+import re
+from pathlib import Path
+
+import numpy as np
+
 from src.config.config import Config
+from src.utils.logger import get_logger
+from src.utils.registry import get_resource
+
+# sentence_transformers is imported on first model load
+
+logger = get_logger("EmbeddingService")
+
+# torch     : the reference SentenceTransformer model (PyTorch)
+# onnx      : the same model exported to ONNX (fp32), run by onnxruntime
+# onnx-int8 : dynamically int8-quantised ONNX export, CPU only
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def _safe_dirname(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+
+
+def _load_sentence_transformer(model_name: str, backend: str, device: str = None):
+    from sentence_transformers import SentenceTransformer
+
+    kwargs = {"device": device} if device else {}
+    if backend == "torch":
+        return SentenceTransformer(model_name, **kwargs)
+
+    if backend == "onnx":
+        model_kwargs = {"file_name": Config.EMBEDDING_ONNX_FILE} if Config.EMBEDDING_ONNX_FILE else {}
+        # exports the fp32 graph on the fly when the model ships none
+        return SentenceTransformer(model_name, backend="onnx", model_kwargs=model_kwargs, **kwargs)
+
+    # onnx-int8: prefer a quantised file published with the model, else
+    # quantise the fp32 export once and keep it under EMBEDDING_ONNX_DIR
+    quantization = Config.EMBEDDING_ONNX_QUANTIZATION
+    file_name = Config.EMBEDDING_ONNX_FILE or f"onnx/model_qint8_{quantization}.onnx"
+    try:
+        return SentenceTransformer(
+            model_name, backend="onnx", model_kwargs={"file_name": file_name}, **kwargs
+        )
+    except Exception as ex:
+        logger.info(f"No {file_name} published for {model_name} ({ex}); quantising locally")
+
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    export_dir = Path(Config.EMBEDDING_ONNX_DIR) / _safe_dirname(model_name)
+    file_name = f"onnx/model_qint8_{quantization}.onnx"
+    if not (export_dir / file_name).exists():
+        fp32 = SentenceTransformer(model_name, backend="onnx", **kwargs)
+        fp32.save(str(export_dir))
+        export_dynamic_quantized_onnx_model(fp32, quantization, str(export_dir))
+        logger.info(f"Wrote int8 ONNX model to {export_dir / file_name}")
+    return SentenceTransformer(
+        str(export_dir), backend="onnx", model_kwargs={"file_name": file_name}, **kwargs
+    )
+
+
+def get_embedding_model(
+    model_name: str,
+    backend: str = "torch",
+    max_seq_length: int = 0,
+    device: str = None
+):
+    """
+    The process-wide SentenceTransformer for one (model, backend,
+    max_seq_length, device) combination.
+    """
+    def load():
+        model = _load_sentence_transformer(model_name, backend, device)
+        if max_seq_length:
+            model.max_seq_length = max_seq_length
+        return model
+
+    key = f"embedding_model:{model_name}:{backend}:{max_seq_length or 'default'}:{device or 'auto'}"
+    return get_resource(key, load)
+
 
 class EmbeddingService:
     """
-    This service loads a SentenceTransformer model once
-    and provides a simple interface to embed text.
+    Text → embedding vectors with the configured model and backend.
+
+    Defaults come from Config (EMBEDDING_MODEL, EMBEDDING_BACKEND,
+    EMBEDDING_BATCH_SIZE, EMBEDDING_NORMALIZE, EMBEDDING_MAX_SEQ_LENGTH,
+    EMBEDDING_DEVICE); any of them can be overridden per instance, e.g.
+    to compare backends side by side.
     """
-    
-    def __init__(self):
-        self.model = SentenceTransformer(Config.EMBEDDING_MODEL)
 
-    def embed_text(self, text: str):
-        """Return embedding for a single piece of text."""
-        return self.model.encode(text, show_progress_bar=False).tolist()
+    def __init__(
+        self,
+        model_name: str = None,
+        backend: str = None,
+        batch_size: int = None,
+        normalize: bool = None,
+        max_seq_length: int = None,
+        device: str = None
+    ):
+        self.model_name = model_name or Config.EMBEDDING_MODEL
+        self.backend = (backend or Config.EMBEDDING_BACKEND).lower()
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend {self.backend!r}; expected one of {BACKENDS}")
+        self.batch_size = batch_size or Config.EMBEDDING_BATCH_SIZE
+        self.normalize = Config.EMBEDDING_NORMALIZE if normalize is None else normalize
+        self.max_seq_length = Config.EMBEDDING_MAX_SEQ_LENGTH if max_seq_length is None else max_seq_length
+        self.device = device or Config.EMBEDDING_DEVICE or None
+
+        self.model = get_embedding_model(
+            self.model_name, self.backend, self.max_seq_length, self.device
+        )
+
+    @property
+    def cache_name(self) -> str:
+        """
+        Identity of the vectors this service produces (the persistent cache
+        is keyed on it): anything that changes the output is part of it.
+        """
+        name = self.model_name
+        if self.backend != "torch":
+            name += f"@{self.backend}"
+        if self.max_seq_length:
+            name += f"@seq{self.max_seq_length}"
+        if not self.normalize:
+            name += "@raw"
+        return name
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """Contiguous [len(texts) x dim] float32 matrix (unit rows when normalize is on)."""
+        if not texts:
+            return np.empty((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        vectors = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=self.normalize,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def embed_text(self, text: str) -> np.ndarray:
+        """float32 vector [dim]."""
+        return self.encode([text])[0]
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        """float32 matrix [len(texts) x dim]."""
+        return self.encode(texts)
 
-    def embed_batch(self, texts: list[str]):
-        """Return embeddings for multiple texts."""
-        return self.model.encode(texts, show_progress_bar=False).tolist()
+    def info(self) -> dict:
+        return {
+            "model": self.model_name,
+            "backend": self.backend,
+            "batch_size": self.batch_size,
+            "normalize": self.normalize,
+            "max_seq_length": self.max_seq_length or getattr(self.model, "max_seq_length", None),
+            "device": str(getattr(self.model, "device", self.device)),
+        }
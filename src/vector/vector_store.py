@@ -1,30 +1,128 @@
 # src/vector/vector_store.py
 
 import os
-from chromadb.config import Settings
+from pathlib import Path
 
+import numpy as np
+
+from src.db.migrations import backfill_chroma_published_ts
 from src.utils.logger import get_logger
+from src.utils.registry import get_resource
 from src.config.config import Config
+# EmbeddingService / get_embedding_model live in embedding_service; re-exported here
+from src.vector.embedding_service import EmbeddingService, get_embedding_model
+
+# chromadb / sentence_transformers are imported on first use: importing this
+# module (and everything that imports it) stays cheap
+
+logger = get_logger("VectorStore")
+
+COLLECTION_NAME = "news_articles"
+
+
+# -----------------------------------
+# Embedding arrays <-> Chroma
+# -----------------------------------
+# Embeddings travel as contiguous float32 NumPy arrays (one row per text);
+# they are converted to/from Chroma's list form only here.
+def as_matrix(embeddings) -> np.ndarray:
+    """
+    Contiguous float32 [n x dim] view of one embedding, a matrix, or a
+    sequence of rows (copies only when the input is not already one).
+    """
+    if isinstance(embeddings, (list, tuple)) and embeddings and isinstance(embeddings[0], np.ndarray):
+        return np.stack(embeddings).astype(np.float32, copy=False)
+    m = np.asarray(embeddings, dtype=np.float32)
+    if m.ndim == 1:
+        m = m[np.newaxis, :]
+    return np.ascontiguousarray(m)
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """
+    L2-normalise embeddings into a contiguous float32 [n x dim] matrix.
+    Zero vectors stay zero (similarity 0 with everything). Input that is
+    already unit-norm float32 (EMBEDDING_NORMALIZE) is returned as is:
+    treat the result as read-only.
+    """
+    x = as_matrix(vectors)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    if np.allclose(norms, 1.0, atol=1e-4):
+        return x
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+def to_chroma(embeddings) -> list:
+    return as_matrix(embeddings).tolist()
+
+
+def from_chroma(embeddings) -> np.ndarray:
+    """Embeddings returned by collection.get/query → float32 matrix."""
+    if embeddings is None or len(embeddings) == 0:
+        return np.empty((0, 0), dtype=np.float32)
+    return as_matrix(embeddings)
+
+
+# -----------------------------------
+# Shared (process-wide) resources
+# -----------------------------------
+def _create_client(path: str):
+    # Compatibility handling for Chroma versions
+    try:
+        from chromadb import PersistentClient  # new versions
+        logger.info("Using New PersistentClient API")
+        return PersistentClient(path=path)
+    except ImportError:
+        pass
 
-# Compatibility handling for Chroma versions
-try:
-    from chromadb import PersistentClient  # new versions
-    CHROMA_MODE = "NEW"
-except ImportError:
     from chromadb import Client            # older versions
-    CHROMA_MODE = "OLD"
+    from chromadb.config import Settings
+    logger.info("Using Legacy Client API")
+    return Client(
+        Settings(
+            chroma_db_impl="duckdb+parquet",
+            persist_directory=path
+        )
+    )
 
-from sentence_transformers import SentenceTransformer
 
-logger = get_logger("VectorStore")
+def get_chroma_client(path: str = None):
+    path = path or Config.CHROMA_DIR
+    return get_resource(f"chroma_client:{path}", lambda: _create_client(path))
 
 
-class EmbeddingService:
-    def __init__(self):
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+def _open_collection(name: str, path: str):
+    collection = get_chroma_client(path).get_or_create_collection(
+        name=name,
+        metadata={"hnsw:space": "cosine"}
+    )
+    # vectors indexed before published_ts existed would drop out of date-range queries
+    backfill_chroma_published_ts(collection, Path(path) / f".{name}.published_ts_backfilled")
+    return collection
+
+
+def get_collection(name: str = COLLECTION_NAME, path: str = None):
+    path = path or Config.CHROMA_DIR
+    return get_resource(f"chroma_collection:{path}:{name}", lambda: _open_collection(name, path))
+
 
-    def embed_text(self, text: str):
-        return self.model.encode(text).tolist()
+def get_embedder():
+    """
+    The shared embedder: EmbeddingService (model and backend from Config),
+    wrapped in the persistent cache when enabled. One instance per process, so every user shares the model
+    and a single writer owns the on-disk cache files.
+    """
+    def build():
+        embedder = EmbeddingService()
+        if Config.EMBEDDING_CACHE_ENABLED:
+            # Read-through persistent cache shared by every embedder user
+            # (dedupe, indexing, offline enrichment, queries)
+            from src.vector.embedding_cache import EmbeddingCache, CachedEmbeddingService
+            embedder = CachedEmbeddingService(embedder, EmbeddingCache(embedder.cache_name))
+        return embedder
+
+    return get_resource("embedder", build)
 
 
 class VectorStore:
@@ -32,54 +130,84 @@ class VectorStore:
     def __init__(self):
         self.logger = get_logger("VectorStore")
 
-        # -------------------------------
-        # Use NEW or OLD Chroma client
-        # -------------------------------
-        if CHROMA_MODE == "NEW":
-            self.logger.info("Using New PersistentClient API")
-            from chromadb import PersistentClient
-            self.client = PersistentClient(path=Config.CHROMA_DIR)
-
-        else:
-            self.logger.info("Using Legacy Client API")
-            from chromadb import Client
-            self.client = Client(
-                Settings(
-                    chroma_db_impl="duckdb+parquet",
-                    persist_directory=Config.CHROMA_DIR
-                )
-            )
-
-        # Create / load collection
-        self.collection = self.client.get_or_create_collection(
-            name="news_articles",
-            metadata={"hnsw:space": "cosine"}
-        )
+        # Client, collection and embedder are process-wide singletons,
+        # resolved on first access: constructing a VectorStore is free.
+        self._client = None
+        self._collection = None
+        self._embedder = None
+
+    @property
+    def client(self):
+        return self._client or get_chroma_client()
+
+    @client.setter
+    def client(self, value):
+        self._client = value
+
+    @property
+    def collection(self):
+        return self._collection or get_collection()
 
-        self.embedder = EmbeddingService()
+    @collection.setter
+    def collection(self, value):
+        self._collection = value
+
+    @property
+    def embedder(self):
+        return self._embedder or get_embedder()
+
+    @embedder.setter
+    def embedder(self, value):
+        self._embedder = value
 
     # -----------------------------------
     # Add a document
     # -----------------------------------
     def add_document(self, doc_id, text, metadata):
-        embedding = self.embedder.embed_text(text)
+        self.upsert([doc_id], [text], [metadata], self.embedder.embed_text(text))
+        self.logger.info(f"Indexed document {doc_id}")
 
+    def upsert(self, ids, documents, metadatas, embeddings):
+        """Write rows; `embeddings` is a float32 [n x dim] matrix (or rows)."""
         self.collection.upsert(
-            ids=[str(doc_id)],
-            documents=[text],
-            metadatas=[metadata],
-            embeddings=[embedding]
+            ids=[str(i) for i in ids],
+            documents=documents,
+            metadatas=metadatas,
+            embeddings=to_chroma(embeddings)
         )
 
-        self.logger.info(f"Indexed document {doc_id}")
+    def get_embeddings(self, ids) -> dict:
+        """Stored embeddings as {id: float32 row} (ids missing from Chroma are left out)."""
+        if not ids:
+            return {}
+        resp = self.collection.get(ids=list(ids), include=["embeddings"])
+        got_ids = resp.get("ids") or []
+        embs = resp.get("embeddings")
+        # some client versions nest results one level deeper: [[id1, id2,...]]
+        if len(got_ids) and isinstance(got_ids[0], list):
+            got_ids = got_ids[0]
+            embs = embs[0] if embs is not None and len(embs) else None
+        if embs is None or len(embs) != len(got_ids):
+            return {}
+        return dict(zip(got_ids, from_chroma(embs)))
 
     # -----------------------------------
     # Query vector search
     # -----------------------------------
-    def query(self, query_text, top_k=5):
+    def query(self, query_text, top_k=5, include=None, where=None):
         embedding = self.embedder.embed_text(query_text)
-
+        return self.query_embedding(embedding, top_k=top_k, include=include, where=where)
+
+    def query_embedding(self, embedding, top_k=5, include=None, where=None):
+        """
+        `embedding` is one float32 vector, or a matrix for a multi-query
+        (one result list per row).
+        """
+        # never pull embeddings back unless explicitly asked for
+        kwargs = {"where": where} if where else {}
         return self.collection.query(
-            query_embeddings=[embedding],
-            n_results=top_k
+            query_embeddings=to_chroma(embedding),
+            n_results=top_k,
+            include=include or ["documents", "metadatas", "distances"],
+            **kwargs
         )
@@ -2,10 +2,17 @@ import streamlit as st
 import sys
 sys.path.append(r"C:\financial_news_intel")
 
-from src.query.query_engine import QueryEngine
+from src.query.query_engine import get_query_engine
 
 st.set_page_config(page_title="Financial News Intelligence", layout="wide")
 
+
+@st.cache_resource
+def load_query_engine():
+    # one engine per Streamlit server, reused across reruns and sessions
+    return get_query_engine()
+
+
 st.title("📈 Financial News Intelligence System")
 st.write("AI-powered search across financial news with entity-aware ranking and LLM explanations.")
 
@@ -16,7 +23,7 @@ query = st.text_input(
 )
 
 if st.button("Search") and query.strip():
-    qe = QueryEngine()
+    qe = load_query_engine()
     with st.spinner("Processing query…"):
         result = qe.search(query, top_k=10)
 